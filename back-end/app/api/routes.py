@@ -1,36 +1,91 @@
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import StudentInput, RecommendationResponse
-from app.services.ml_service import MLService
-import os
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.dependencies import get_ml_service, run_evaluation, run_scoring
+from typing import Optional
+from app.models.schemas import (
+    StudentInput, RecommendationResponse, BatchStudentInput, BatchRecommendationResponse,
+    CombinedRecommendationResponse, WhatIfInput, WhatIfResponse
+)
+from app.services.ml_service import MLService, BATCH_CHUNK_SIZE
 
 router = APIRouter()
 
-ml_service = MLService(
-    data_path=os.path.join(os.path.dirname(__file__), '../../data/dataset.csv'),
-    model_path=os.path.join(os.path.dirname(__file__), '../../data/trained_model.pkl')
-)
-
 @router.post("/recommend", response_model=RecommendationResponse)
-async def recommend(input_data: StudentInput):
+async def recommend(input_data: StudentInput,
+                    top_k: Optional[int] = Query(None, ge=1),
+                    min_score: Optional[float] = None,
+                    ml_service: MLService = Depends(get_ml_service)):
     try:
-        response = ml_service.recommend_courses(input_data)
+        response = await run_scoring(ml_service.recommend_courses, input_data, top_k, min_score)
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/recommend_cross_stream", response_model=RecommendationResponse)
-async def recommend_cross_stream(input_data: StudentInput):
+async def recommend_cross_stream(input_data: StudentInput,
+                                 top_k: Optional[int] = Query(None, ge=1),
+                                 min_score: Optional[float] = None,
+                                 ml_service: MLService = Depends(get_ml_service)):
     try:
-        response = ml_service.recommend_cross_stream_courses(input_data)
+        response = await run_scoring(ml_service.recommend_cross_stream_courses, input_data, top_k, min_score)
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/recommend/all", response_model=CombinedRecommendationResponse)
+async def recommend_all(input_data: StudentInput,
+                        top_k: Optional[int] = Query(None, ge=1),
+                        offset: int = Query(0, ge=0),
+                        min_score: Optional[float] = None,
+                        ml_service: MLService = Depends(get_ml_service)):
+    try:
+        return await run_scoring(ml_service.recommend_all, input_data, top_k, offset, min_score)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/whatif", response_model=WhatIfResponse)
+async def whatif(input_data: WhatIfInput, ml_service: MLService = Depends(get_ml_service)):
+    # Answered from the precomputed table; no model inference
+    try:
+        response = ml_service.whatif(input_data)
+    except LookupError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if response is None:
+        raise HTTPException(status_code=404, detail="Unknown district or stream")
+    return response
+
+@router.post("/recommend/batch", response_model=BatchRecommendationResponse)
+async def recommend_batch(input_data: BatchStudentInput, stream: bool = False,
+                          ml_service: MLService = Depends(get_ml_service)):
+    try:
+        if stream:
+            # NDJSON: one RecommendationResponse per line, in the order of input_data.students
+            return StreamingResponse(
+                _stream_batch(ml_service, input_data), media_type="application/x-ndjson")
+        results = await run_scoring(
+            ml_service.recommend_courses_batch, input_data.students, input_data.cross_stream,
+            input_data.top_k, input_data.min_score)
+        return BatchRecommendationResponse.model_construct(results=results)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _stream_batch(ml_service: MLService, input_data: BatchStudentInput):
+    students = input_data.students
+    for start in range(0, len(students), BATCH_CHUNK_SIZE):
+        responses = await run_scoring(
+            ml_service.recommend_courses_batch,
+            students[start:start + BATCH_CHUNK_SIZE], input_data.cross_stream,
+            input_data.top_k, input_data.min_score)
+        yield "".join(response.model_dump_json() + "\n" for response in responses)
+
+@router.get("/cache/stats")
+async def cache_stats(ml_service: MLService = Depends(get_ml_service)):
+    return {**ml_service.cache.stats(), 'model_version': ml_service.model_version}
+
 @router.get("/evaluate")
-async def evaluate_model():
+async def evaluate_model(ml_service: MLService = Depends(get_ml_service)):
     try:
-        results = ml_service.model.evaluate_model()
+        results = await run_evaluation(ml_service.evaluate)
         return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
\ No newline at end of file
@@ -0,0 +1,59 @@
+import os
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name, default):
+    return float(os.environ.get(name, default))
+
+
+DATA_DIR = os.environ.get('DATA_DIR', os.path.join(os.path.dirname(__file__), '../data'))
+DATASET_PATH = os.environ.get('DATASET_PATH', os.path.join(DATA_DIR, 'dataset.csv'))
+MODEL_PATH = os.environ.get('MODEL_PATH', os.path.join(DATA_DIR, 'trained_model.pkl'))
+# Binary serving bundle written after training (see app/models/artifact.py)
+ARTIFACT_PATH = os.environ.get('ARTIFACT_PATH', os.path.join(DATA_DIR, 'artifact'))
+# Serve from the memory-mapped artifact only, never keeping the preprocessed frame
+LOW_MEMORY_SERVING = _env_int('LOW_MEMORY_SERVING', 1) == 1
+# Precomputed what-if lists written by whatif.py (see app/services/whatif.py)
+WHATIF_PATH = os.environ.get('WHATIF_PATH', os.path.join(DATA_DIR, 'whatif.npz'))
+
+# Background model loads (POST /api/v1/admin/models/load)
+# Held-out NDCG@5 a loaded model must reach before it takes traffic (0 = probe scoring only)
+RELOAD_MIN_NDCG = _env_float('RELOAD_MIN_NDCG', 0)
+# Required in the X-Admin-Token header of admin endpoints, which are disabled while unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+# Worker processes serving the API (set by run.py); model slots live in each process,
+# so the admin endpoints that change them refuse to run with more than one
+WORKERS = _env_int('WEB_CONCURRENCY', 1)
+
+# Startup warm-up: /ready stays 503 until these requests have been scored
+WARMUP_ENABLED = _env_int('WARMUP_ENABLED', 1) == 1
+# Most common (district, stream) pairs to score (0 = every pair)
+WARMUP_PAIRS = _env_int('WARMUP_PAIRS', 50)
+WARMUP_ZSCORES = [float(z) for z in os.environ.get('WARMUP_ZSCORES', '-1,-0.5,0,0.5,1,1.5,2,2.5').split(',')]
+# Students per scoring-pool task
+WARMUP_BATCH_SIZE = _env_int('WARMUP_BATCH_SIZE', 32)
+
+# Largest students list accepted by /recommend/batch
+BATCH_MAX_STUDENTS = _env_int('BATCH_MAX_STUDENTS', 10000)
+
+# Recommendation result cache
+CACHE_MAX_ENTRIES = _env_int('RECOMMENDATION_CACHE_MAX_ENTRIES', 4096)
+CACHE_TTL_SECONDS = _env_float('RECOMMENDATION_CACHE_TTL_SECONDS', 3600)
+# Z-scores are rounded to this step before lookup and scoring; 0.0001 matches the published precision
+CACHE_ZSCORE_QUANTUM = _env_float('RECOMMENDATION_CACHE_ZSCORE_QUANTUM', 0.0001)
+
+# Cache-Control max-age for the metadata endpoints (districts, streams, courses, ...)
+METADATA_MAX_AGE_SECONDS = _env_int('METADATA_MAX_AGE_SECONDS', 3600)
+
+# Score small batches with the NumPy tree walker instead of Booster.predict
+COMPILED_INFERENCE = _env_int('COMPILED_INFERENCE', 1) == 1
+# Largest rows x trees product scored by the compiled path
+COMPILED_INFERENCE_MAX_CELLS = _env_int('COMPILED_INFERENCE_MAX_CELLS', 4096)
+
+# Threads running CPU-bound scoring off the event loop, per worker process
+SCORING_THREADS = _env_int('SCORING_THREADS', min(4, os.cpu_count() or 1))
+# OpenMP threads per Booster.predict call (0 = LightGBM default); use 1 with several workers
+PREDICT_THREADS = _env_int('PREDICT_THREADS', 0)
@@ -1,5 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import asyncio
 from fastapi import HTTPException
-from app.services.ml_service import MLService
+from app.services.ml_service import MLService, load_prediction_model
+from app.services.warmup import WarmUp, common_pairs
+from app import config
+
+def prepare_artifact():
+    """Build the serving artifact once, before worker processes start and attach to it."""
+    load_prediction_model(config.DATASET_PATH, config.MODEL_PATH, config.ARTIFACT_PATH)
+
+def init_ml_service():
+    global ml_service, scoring_executor, evaluation_executor, warmup
+    ml_service = MLService(
+        data_path=config.DATASET_PATH,
+        model_path=config.MODEL_PATH,
+        artifact_path=config.ARTIFACT_PATH,
+        whatif_path=config.WHATIF_PATH
+    )
+    scoring_executor = ThreadPoolExecutor(
+        max_workers=config.SCORING_THREADS, thread_name_prefix="scoring")
+    # Evaluation re-reads the CSV; one thread of its own keeps it off the scoring pool
+    evaluation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="evaluation")
+    warmup = WarmUp(enabled=config.WARMUP_ENABLED)
+    return ml_service
+
+async def warm_up():
+    """Score the common requests on the scoring pool; /ready turns true when this returns."""
+    if warmup.state != 'pending':
+        return
+    pairs = common_pairs(ml_service.model, config.WARMUP_PAIRS)
+    await warmup.run(ml_service, run_scoring, pairs, config.WARMUP_ZSCORES, config.WARMUP_BATCH_SIZE)
+
+def shutdown_ml_service():
+    global ml_service, scoring_executor, evaluation_executor, warmup
+    if scoring_executor is not None:
+        scoring_executor.shutdown(wait=True)
+    if evaluation_executor is not None:
+        evaluation_executor.shutdown(wait=True)
+    ml_service = None
+    scoring_executor = None
+    evaluation_executor = None
+    warmup = None
 
 def get_ml_service():
     global ml_service
@@ -7,5 +49,18 @@ def get_ml_service():
         raise HTTPException(status_code=500, detail="ML service not initialized")
     return ml_service
 
-# Global ML service instance (will be initialized in main.py)
-ml_service = None
\ No newline at end of file
+async def run_scoring(func, *args, **kwargs):
+    """Run CPU-bound model work on the bounded scoring pool instead of the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(scoring_executor, partial(func, *args, **kwargs))
+
+async def run_evaluation(func, *args, **kwargs):
+    """Run a model evaluation on its own thread, so it never holds a scoring thread."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(evaluation_executor, partial(func, *args, **kwargs))
+
+# Global ML service instance shared by every router (initialized on app startup in main.py)
+ml_service = None
+scoring_executor = None
+evaluation_executor = None
+warmup = None
@@ -1,11 +1,35 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import asyncio
+import time
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router as api_router
+from app.routers.recommendations import router as recommendations_router
+from app.routers.monitoring import router as monitoring_router
+from app.routers.admin import router as admin_router
+from app.dependencies import init_ml_service, shutdown_ml_service, warm_up
+from app.services.metrics import REQUEST_SECONDS
+from app.services.profiler import PROFILER
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Each worker process attaches to the prebuilt artifact; every router shares this instance
+    init_ml_service()
+    # Warm up in the background so the server starts answering /ready (503) right away
+    warmup_task = asyncio.create_task(warm_up())
+    yield
+    warmup_task.cancel()
+    shutdown_ml_service()
 
 app = FastAPI(
     title="University Degree Recommendation System",
     description="API for recommending university degrees based on student data",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -17,8 +41,37 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+@app.exception_handler(RequestValidationError)
+async def validation_error(request: Request, exc: RequestValidationError):
+    # orjson writes the rejected NaN/Infinity inputs echoed in the errors as null
+    return ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    profiled = PROFILER.request_started()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep the series count bounded
+        route = request.scope.get("route")
+        REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=status
+        )
+        if profiled:
+            PROFILER.request_finished()
+
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(recommendations_router, prefix="/api/v1")
+app.include_router(admin_router, prefix="/api/v1")
+app.include_router(monitoring_router)
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the University Degree Recommendation API"}
\ No newline at end of file
+    return {"message": "Welcome to the University Degree Recommendation API"}
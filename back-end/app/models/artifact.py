@@ -0,0 +1,261 @@
+"""Versioned on-disk bundle of everything serving needs from a trained PredictionModel.
+
+Layout of an artifact directory::
+
+    manifest.json   format version, sources, scalar values and the list of tables
+    booster.txt     LightGBM model text
+    <table>.npy     one array per table column, loadable with mmap_mode='r'
+
+Strings are stored as fixed-width unicode arrays so every table can be
+memory-mapped and shared between processes through the page cache.
+
+Each save writes a new ``<artifact>.<timestamp>`` directory and then points
+the ``<artifact>`` symlink at it with an atomic rename, so a process loading
+the artifact always sees one complete bundle. The previous bundle is kept
+for processes that still have it mapped.
+
+The manifest also records the dataset the tables were built from and a hash
+of the booster, so ``check_sources`` can refuse a bundle that no longer
+matches dataset.csv or the model file.
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from app.models.encoding import CategoryEncoder
+from app.models.features import CATEGORICAL_COLS, FEATURES
+
+ARTIFACT_VERSION = 4
+MANIFEST_FILE = 'manifest.json'
+BOOSTER_FILE = 'booster.txt'
+
+# PredictionModel attributes stored as (possibly multi-indexed) Series
+SERIES_TABLES = [
+    'course_avg_zscore', 'course_demand', 'course_popularity',
+    'district_course_count', 'stream_course_count',
+    'course_zscore_sum', 'course_zscore_count', 'course_median_zscore'
+]
+
+# Bundles kept next to the current one
+KEEP_PREVIOUS = 1
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def dataset_fingerprint(data_path):
+    """Path, size and modification time of a dataset file, enough to notice it was edited."""
+    stat = os.stat(data_path)
+    return {'path': os.path.abspath(data_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def check_sources(manifest, data_path, model_path):
+    """Raise ArtifactError unless the bundle was built from ``data_path`` and ``model_path`` as they are now."""
+    sources = manifest.get('sources') or {}
+    dataset = sources.get('dataset')
+    if dataset is None or dataset != dataset_fingerprint(data_path):
+        raise ArtifactError(f"Artifact was not built from the current {data_path}")
+    if not os.path.exists(model_path):
+        raise ArtifactError(f"Model file {model_path} is missing")
+    if sources.get('booster_sha1') != file_sha1(model_path):
+        raise ArtifactError(f"Artifact booster does not match {model_path}")
+
+
+def record_dataset(artifact_path, data_path):
+    """Mark the current bundle as built from ``data_path`` as it is now.
+
+    For ``ingest.py``, which appends the rows it already folded into the
+    bundle to the dataset after saving.
+    """
+    manifest_path = os.path.join(os.path.realpath(artifact_path), MANIFEST_FILE)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    manifest['sources']['dataset'] = dataset_fingerprint(data_path)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + '.tmp', manifest_path)
+
+
+def artifact_exists(artifact_path):
+    return os.path.exists(os.path.join(artifact_path, MANIFEST_FILE))
+
+
+def save_artifact(model, artifact_path):
+    """Write the model's serving state to ``artifact_path``, replacing any previous bundle."""
+    bundle_path = f'{artifact_path}.{time.strftime("%Y%m%d%H%M%S")}-{time.time_ns() % 10**9:09d}'
+    tmp_path = f'{bundle_path}.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    booster = getattr(model.model, 'booster_', model.model)
+    booster_path = os.path.join(tmp_path, BOOSTER_FILE)
+    booster.save_model(booster_path)
+
+    arrays = {}
+    for col in CATEGORICAL_COLS:
+        arrays[f'encoder.{col}'] = model.label_encoders[col].classes_
+    for name in SERIES_TABLES:
+        arrays.update(_series_arrays(name, getattr(model, name)))
+    # One entry per scored row, needed only to fold in new rows: codes into
+    # course_zscore_count's courses instead of names. load_artifact leaves them
+    # on disk; load_ingest_tables reads them when ingest() asks.
+    courses = pd.CategoricalDtype(model.course_zscore_count.index)
+    arrays['course_zscores.codes'] = pd.CategoricalIndex(
+        model.course_zscores.index, dtype=courses).codes.astype(np.int32)
+    arrays['course_zscores.values'] = model.course_zscores.to_numpy()
+    arrays['course_table.index'] = model.course_table.index.to_numpy()
+    for col in model.course_table.columns:
+        arrays[f'course_table.{col}'] = model.course_table[col].to_numpy()
+
+    candidate_streams = list(model.stream_candidates)
+    for i, stream in enumerate(candidate_streams):
+        pairs = model.stream_candidates[stream]
+        arrays[f'candidates.{i}.Course'] = pairs['Course'].to_numpy()
+        arrays[f'candidates.{i}.University'] = pairs['University'].to_numpy()
+
+    for name, values in arrays.items():
+        values = np.asarray(values)
+        if values.dtype == object:
+            values = values.astype(str)
+        np.save(os.path.join(tmp_path, name + '.npy'), values, allow_pickle=False)
+
+    manifest = {
+        'format_version': ARTIFACT_VERSION,
+        'created_at': time.time(),
+        'features': FEATURES,
+        'sources': {
+            # None for a model filled without reading a dataset
+            'dataset': model.data_source,
+            'booster_sha1': file_sha1(booster_path)
+        },
+        'evaluation_held_out': model.evaluation_held_out,
+        'latest_exam_year': model.latest_exam_year,
+        'intake_max': float(model.intake_max),
+        'districts': model.districts,
+        'streams': model.streams,
+        'relevance_bins': model.relevance_bins,
+        'candidate_streams': candidate_streams,
+        'index_names': {
+            name: list(getattr(model, name).index.names) for name in SERIES_TABLES
+        },
+        'tables': sorted(arrays)
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    os.rename(tmp_path, bundle_path)
+    if os.path.isdir(artifact_path) and not os.path.islink(artifact_path):
+        # A plain directory written by an older version; it cannot be swapped atomically
+        shutil.rmtree(artifact_path)
+    link_path = f'{bundle_path}.link'
+    os.symlink(os.path.basename(bundle_path), link_path)
+    os.replace(link_path, artifact_path)
+    _prune_bundles(artifact_path, bundle_path)
+
+
+def _prune_bundles(artifact_path, current_path):
+    bundles = sorted(
+        path for path in glob.glob(f'{glob.escape(artifact_path)}.*')
+        if os.path.isdir(path) and not os.path.islink(path)
+        and not path.endswith('.tmp') and path != current_path
+    )
+    for path in bundles[:max(len(bundles) - KEEP_PREVIOUS, 0)]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def load_artifact(model, artifact_path, mmap_mode='r'):
+    """Populate ``model`` from an artifact directory without touching the CSV."""
+    # Resolve the symlink once so a concurrent save cannot mix two bundles
+    artifact_path = os.path.realpath(artifact_path)
+    with open(os.path.join(artifact_path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != ARTIFACT_VERSION:
+        raise ArtifactError(
+            f"Artifact format {manifest.get('format_version')} does not match expected {ARTIFACT_VERSION}")
+    if manifest['features'] != FEATURES:
+        raise ArtifactError("Artifact was built for a different feature list")
+
+    def array(name):
+        return np.load(os.path.join(artifact_path, name + '.npy'), mmap_mode=mmap_mode, allow_pickle=False)
+
+    model.df = None
+    model.artifact_bundle = artifact_path
+    model.test_data = None
+    model.test_group_counts = None
+    model.model = lgb.Booster(model_file=os.path.join(artifact_path, BOOSTER_FILE))
+
+    model.label_encoders = {}
+    for col in CATEGORICAL_COLS:
+        model.label_encoders[col] = CategoryEncoder(np.asarray(array(f'encoder.{col}')))
+
+    for name in SERIES_TABLES:
+        setattr(model, name, _load_series(array, name, manifest['index_names'][name]))
+    model.course_zscores = None
+
+    model.course_table = pd.DataFrame(
+        {col: array(f'course_table.{col}') for col in ['Course', 'University', 'Intake']},
+        index=pd.Index(array('course_table.index'), name='Matched_Course_University')
+    )
+    model.stream_candidates = {
+        stream: pd.DataFrame({
+            'Course': array(f'candidates.{i}.Course'),
+            'University': array(f'candidates.{i}.University')
+        })
+        for i, stream in enumerate(manifest['candidate_streams'])
+    }
+
+    model.latest_exam_year = manifest['latest_exam_year']
+    model.intake_max = manifest['intake_max']
+    model.districts = manifest['districts']
+    model.streams = manifest['streams']
+    model.relevance_bins = manifest['relevance_bins']
+    model.data_source = manifest['sources']['dataset']
+    model.evaluation_held_out = manifest.get('evaluation_held_out', True)
+    return manifest
+
+
+def load_ingest_tables(model, bundle_path):
+    """Read the per-row course z-scores of the bundle ``model`` was loaded from into memory."""
+    with open(os.path.join(bundle_path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    def array(name):
+        return np.load(os.path.join(bundle_path, name + '.npy'), allow_pickle=False)
+
+    # The codes index the bundle's own course list
+    courses = pd.CategoricalDtype(pd.Index(array('course_zscore_count.index0')))
+    index = pd.CategoricalIndex(pd.Categorical.from_codes(array('course_zscores.codes'), dtype=courses),
+                                name=manifest['index_names']['course_zscore_count'][0])
+    model.course_zscores = pd.Series(array('course_zscores.values'), index=index)
+
+
+def _series_arrays(name, series):
+    arrays = {f'{name}.values': series.to_numpy()}
+    for level in range(series.index.nlevels):
+        arrays[f'{name}.index{level}'] = series.index.get_level_values(level).to_numpy()
+    return arrays
+
+
+def _load_series(array, name, index_names):
+    levels = [array(f'{name}.index{level}') for level in range(len(index_names))]
+    if len(levels) == 1:
+        index = pd.Index(levels[0], name=index_names[0])
+    else:
+        index = pd.MultiIndex.from_arrays(levels, names=index_names)
+    return pd.Series(array(f'{name}.values'), index=index)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+
+class CategoryEncoder:
+    """Dictionary-backed label encoder with a reserved code for unseen values.
+
+    Known values get the same codes as sklearn's LabelEncoder (position in the
+    sorted classes), so boosters trained with either encoder are compatible.
+    Any value not seen at fit time maps to ``unknown_code`` (``len(classes_)``)
+    instead of raising.
+    """
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+        self.unknown_code = len(self.classes_)
+        self._codes = {value: code for code, value in enumerate(self.classes_.tolist())}
+        self._index = pd.Index(self.classes_)
+
+    @classmethod
+    def fit(cls, values):
+        """Return the fitted encoder and the codes of ``values``."""
+        codes, classes = pd.factorize(pd.Series(values), sort=True)
+        return cls(np.asarray(classes)), codes.astype(np.int64)
+
+    def extend(self, values):
+        """Return an encoder with the unseen ``values`` appended as new classes, and their codes.
+
+        Existing codes are unchanged; new classes follow in sorted order.
+        """
+        known = self._index.get_indexer(pd.Index(values)) >= 0
+        if known.all():
+            return self, self.transform(values).astype(np.int64)
+        new_classes = pd.unique(pd.Series(values)[~known])
+        encoder = CategoryEncoder(np.concatenate([self.classes_, np.sort(new_classes)]).astype(object))
+        return encoder, encoder.transform(values).astype(np.int64)
+
+    def __contains__(self, value):
+        return value in self._codes
+
+    def encode(self, value):
+        return self._codes.get(value, self.unknown_code)
+
+    def transform(self, values):
+        codes = self._index.get_indexer(pd.Index(values))
+        codes[codes < 0] = self.unknown_code
+        return codes
@@ -0,0 +1,72 @@
+"""Vectorized ranking metrics over many query groups at once.
+
+Rows are sorted once by (group, score) and every metric is computed with
+segmented NumPy reductions instead of a Python loop over groups. NDCG
+matches sklearn's ``ndcg_score`` (linear gains, tied predictions share
+their gain, 0 for groups without relevant rows).
+"""
+import numpy as np
+
+
+def _segment_starts(keys):
+    """Start position of every run of equal ``keys`` (already sorted)."""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def _positions(starts, n):
+    """Position of each row inside its segment."""
+    sizes = np.diff(np.r_[starts, n])
+    return np.arange(n) - np.repeat(starts, sizes)
+
+
+def _discount(positions, k):
+    return np.where(positions < k, 1.0 / np.log2(positions + 2.0), 0.0)
+
+
+class GroupedRanking:
+    """Per-group metrics for rows of ``groups`` scored by ``scores`` against ``relevance``."""
+
+    def __init__(self, groups, relevance, scores):
+        groups = np.asarray(groups)
+        relevance = np.asarray(relevance, dtype=np.float64)
+        scores = np.asarray(scores, dtype=np.float64)
+        self.n = len(groups)
+
+        group_codes = np.unique(groups, return_inverse=True)[1]
+        # Predicted order: by group, then score descending (ties stay in row order)
+        order = np.lexsort((-scores, group_codes))
+        self.codes = group_codes[order]
+        self.relevance = relevance[order]
+        self.scores = scores[order]
+        self.group_starts = _segment_starts(self.codes)
+        self.group_sizes = np.diff(np.r_[self.group_starts, self.n])
+        self.positions = _positions(self.group_starts, self.n)
+        # Rows of each group in original order, to map group-level results back to labels
+        self.group_rows = order[self.group_starts]
+
+        # Runs of equal predictions inside a group share their gain (sklearn's tie averaging)
+        tie_starts = np.flatnonzero(np.r_[True, (self.codes[1:] != self.codes[:-1])
+                                          | (self.scores[1:] != self.scores[:-1])])
+        self.tie_starts = tie_starts
+        self.tie_sizes = np.diff(np.r_[tie_starts, self.n])
+
+        # Ideal order: by group, then relevance descending
+        self.ideal_relevance = self.relevance[np.lexsort((-self.relevance, self.codes))]
+
+    def ndcg(self, k):
+        discount = _discount(self.positions, k)
+        block_discount = np.add.reduceat(discount, self.tie_starts) / self.tie_sizes
+        dcg = np.add.reduceat(self.relevance * np.repeat(block_discount, self.tie_sizes), self.group_starts)
+        idcg = np.add.reduceat(self.ideal_relevance * discount, self.group_starts)
+        return np.divide(dcg, idcg, out=np.zeros_like(dcg), where=idcg > 0)
+
+    def average_precision(self):
+        """AP per group (relevant means relevance > 0); NaN for groups with nothing relevant."""
+        relevant = (self.relevance > 0).astype(np.float64)
+        cumulative = np.cumsum(relevant)
+        hits = cumulative - np.repeat(cumulative[self.group_starts] - relevant[self.group_starts],
+                                      self.group_sizes)
+        precision_at_hit = np.where(relevant > 0, hits / (self.positions + 1), 0.0)
+        num_relevant = np.add.reduceat(relevant, self.group_starts)
+        return np.divide(np.add.reduceat(precision_at_hit, self.group_starts), num_relevant,
+                         out=np.full(len(num_relevant), np.nan), where=num_relevant > 0)
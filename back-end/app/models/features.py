@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+FEATURES = [
+    'Exam_Year_encoded', 'District_encoded', 'Stream_encoded', 'Course_encoded',
+    'University_encoded', 'Zscore_Values', 'zscore_percentile',
+    'zscore_vs_course_avg', 'district_competition', 'stream_course_compatibility',
+    'course_popularity', 'intake_normalized', 'is_NQC_encoded', 'course_demand'
+]
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+TARGET = 'Zscore_Relevance'
+
+CATEGORICAL_COLS = ['Exam_Year', 'District', 'Stream', 'Course', 'University', 'is_NQC']
+# categorical_feature for every Dataset a ranker is trained or continued on. The
+# encoded columns are split as ordered codes, as the shipped ranker was trained;
+# a warm start or a search refit must see the features the same way.
+TRAINING_CATEGORICAL_FEATURES = []
+
+STREAMS = ['Arts', 'Commerce', 'Biological Science', 'Physical Science',
+           'Engineering Technology', 'Biosystems Technology', 'Cross Stream']
+CROSS_STREAM = 'Cross Stream'
+
+
+def matched_course_university(course, university):
+    return course + ' (' + university + ')'
+
+
+def district_competition(district, matched, district_course_count):
+    """Look up (District, Matched_Course_University) row counts for aligned arrays, 0 when unseen."""
+    keys = pd.MultiIndex.from_arrays([np.asarray(district), np.asarray(matched)])
+    return district_course_count.reindex(keys).fillna(0).to_numpy(dtype=np.int64)
+
+
+def cross_stream_compatibility(stream_course_count):
+    """Per course row counts summed over every known stream."""
+    known = stream_course_count.index.get_level_values(0).isin(STREAMS)
+    return stream_course_count[known].groupby(level=1).sum()
+
+
+def stream_course_compatibility(stream, matched, stream_course_count):
+    """Look up (Stream, Matched_Course_University) row counts; Cross Stream rows count every stream."""
+    stream = np.asarray(stream)
+    matched = np.asarray(matched)
+    keys = pd.MultiIndex.from_arrays([stream, matched])
+    result = stream_course_count.reindex(keys).fillna(0).to_numpy(dtype=np.int64)
+
+    is_cross = stream == CROSS_STREAM
+    if is_cross.any():
+        result[is_cross] = cross_stream_compatibility(stream_course_count).reindex(
+            matched[is_cross]).fillna(0).to_numpy(dtype=np.int64)
+    return result
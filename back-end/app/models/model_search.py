@@ -0,0 +1,199 @@
+"""Cross-validated hyperparameter search for the lambdarank model.
+
+Folds never split a query group: either GroupKFold over ``group_id`` or one
+fold per exam year. Each fold's train and validation sets are binned once
+and saved as LightGBM Dataset binaries, which every trial then loads
+instead of rebuilding them from the frame. Trials run in a process pool
+with a per-trial thread cap. A trial is pruned when its running mean over
+the folds finished so far is below the median of completed trials at the
+same point.
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+import lightgbm as lgb
+import numpy as np
+from sklearn.model_selection import GroupKFold
+
+from app.models.features import FEATURES, TARGET, TRAINING_CATEGORICAL_FEATURES
+from app.models.prediction_model import group_sizes, sort_by_group
+
+BASE_PARAMS = {
+    'objective': 'lambdarank',
+    'metric': 'ndcg',
+    'eval_at': [5],
+    'verbose': -1,
+    'seed': 42,
+    'bagging_freq': 1
+}
+
+# Parameters fixed when the Dataset binaries are built; trials cannot change them
+DATASET_PARAMS = {'max_bin': 255, 'feature_pre_filter': False, 'verbose': -1}
+
+# name -> (kind, choices or (low, high))
+SEARCH_SPACE = {
+    'num_leaves': ('choice', [15, 31, 63, 127]),
+    'max_depth': ('choice', [-1, 4, 6, 8]),
+    'learning_rate': ('log_uniform', (0.02, 0.2)),
+    'min_data_in_leaf': ('choice', [5, 10, 20, 50]),
+    'feature_fraction': ('uniform', (0.6, 1.0)),
+    'bagging_fraction': ('uniform', (0.6, 1.0)),
+    'lambda_l2': ('log_uniform', (1e-3, 10.0))
+}
+
+# Completed trials needed before pruning starts
+MIN_TRIALS_BEFORE_PRUNING = 4
+
+
+def sample_params(rng):
+    params = {}
+    for name, (kind, spec) in SEARCH_SPACE.items():
+        if kind == 'choice':
+            params[name] = spec[rng.integers(len(spec))]
+        elif kind == 'uniform':
+            params[name] = float(rng.uniform(*spec))
+        else:
+            params[name] = float(np.exp(rng.uniform(np.log(spec[0]), np.log(spec[1]))))
+    # Plain Python types so params are JSON-serializable
+    return {name: value.item() if isinstance(value, np.generic) else value for name, value in params.items()}
+
+
+def make_folds(df, scheme='group', n_splits=5):
+    """(train positions, validation positions) per fold; no query group is split."""
+    if scheme == 'year':
+        years = df['Exam_Year'].to_numpy()
+        return [(np.flatnonzero(years != year), np.flatnonzero(years == year)) for year in np.unique(years)]
+    if scheme == 'group':
+        return list(GroupKFold(n_splits=n_splits).split(df, groups=df['group_id']))
+    raise ValueError(f"Unknown fold scheme: {scheme}")
+
+
+def build_fold_datasets(df, folds, cache_dir):
+    """Save each fold's train/validation Datasets as binaries, reusing them when already built."""
+    paths = []
+    for i, (train_idx, valid_idx) in enumerate(folds):
+        train_path = os.path.join(cache_dir, f'fold{i}.train.bin')
+        valid_path = os.path.join(cache_dir, f'fold{i}.valid.bin')
+        paths.append((train_path, valid_path))
+        if os.path.exists(train_path) and os.path.exists(valid_path):
+            continue
+        os.makedirs(cache_dir, exist_ok=True)
+        train_rows = sort_by_group(df.iloc[train_idx])
+        valid_rows = sort_by_group(df.iloc[valid_idx])
+        train_set = _dataset(train_rows)
+        valid_set = _dataset(valid_rows, reference=train_set)
+        # The validation set is binned with the training set's bin boundaries
+        train_set.construct()
+        valid_set.construct()
+        train_set.save_binary(train_path + '.tmp')
+        valid_set.save_binary(valid_path + '.tmp')
+        os.replace(train_path + '.tmp', train_path)
+        os.replace(valid_path + '.tmp', valid_path)
+    return paths
+
+
+def dataset_cache_dir(root, data_path, scheme, n_splits):
+    """Cache directory keyed by the dataset file, the fold layout and the feature treatment."""
+    stat = os.stat(data_path)
+    key = json.dumps([os.path.abspath(data_path), stat.st_size, stat.st_mtime_ns,
+                      scheme, n_splits, FEATURES, TRAINING_CATEGORICAL_FEATURES, DATASET_PARAMS])
+    return os.path.join(root, hashlib.sha1(key.encode()).hexdigest()[:12])
+
+
+def _dataset(rows, reference=None):
+    return lgb.Dataset(
+        data=rows[FEATURES],
+        label=rows[TARGET],
+        group=group_sizes(rows),
+        categorical_feature=TRAINING_CATEGORICAL_FEATURES,
+        params=DATASET_PARAMS,
+        reference=reference,
+        free_raw_data=True
+    )
+
+
+def run_trial(trial, params, fold_paths, num_threads, num_boost_round,
+              early_stopping_rounds, prune_below):
+    """Train and score ``params`` on each fold; runs in a worker process.
+
+    ``prune_below[k]`` is the running-mean NDCG@5 a trial must reach after
+    fold k to continue (None disables pruning at that fold).
+    """
+    start = time.perf_counter()
+    params = {**BASE_PARAMS, **params, 'num_threads': num_threads}
+    scores, iterations = [], []
+    pruned = False
+    for k, (train_path, valid_path) in enumerate(fold_paths):
+        train_set = lgb.Dataset(train_path, params=DATASET_PARAMS)
+        valid_set = lgb.Dataset(valid_path, reference=train_set, params=DATASET_PARAMS)
+        booster = lgb.train(
+            params, train_set, num_boost_round=num_boost_round, valid_sets=[valid_set],
+            callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False)]
+        )
+        scores.append(booster.best_score['valid_0']['ndcg@5'])
+        iterations.append(booster.best_iteration)
+        threshold = prune_below[k] if k < len(prune_below) else None
+        if threshold is not None and k < len(fold_paths) - 1 and np.mean(scores) < threshold:
+            pruned = True
+            break
+    return {
+        'trial': trial,
+        'params': params,
+        'fold_scores': scores,
+        'best_iterations': iterations,
+        'mean_ndcg@5': float(np.mean(scores)),
+        'pruned': pruned,
+        'seconds': time.perf_counter() - start
+    }
+
+
+def _prune_thresholds(results, num_folds):
+    """Median running mean of the completed trials after each fold."""
+    complete = [r['fold_scores'] for r in results if not r['pruned']]
+    if len(complete) < MIN_TRIALS_BEFORE_PRUNING:
+        return [None] * num_folds
+    running = np.cumsum(complete, axis=1) / np.arange(1, num_folds + 1)
+    return np.median(running, axis=0).tolist()
+
+
+def search(fold_paths, num_trials, workers=1, threads_per_trial=1, num_boost_round=1000,
+           early_stopping_rounds=50, seed=42, prune=True, log=print):
+    """Random search over SEARCH_SPACE; returns every trial, best first."""
+    rng = np.random.default_rng(seed)
+    candidates = [sample_params(rng) for _ in range(num_trials)]
+    results = []
+    # LightGBM's OpenMP runtime is not fork-safe once used, so workers are spawned
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = set()
+        next_trial = 0
+        while next_trial < num_trials or pending:
+            # Submit lazily so every trial is pruned against the latest completed ones
+            while next_trial < num_trials and len(pending) < workers:
+                thresholds = _prune_thresholds(results, len(fold_paths)) if prune else []
+                pending.add(pool.submit(
+                    run_trial, next_trial, candidates[next_trial], fold_paths, threads_per_trial,
+                    num_boost_round, early_stopping_rounds, thresholds))
+                next_trial += 1
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results.append(result)
+                log(f"trial {result['trial']:3d}  NDCG@5 {result['mean_ndcg@5']:.4f}"
+                    f"{'  (pruned)' if result['pruned'] else ''}  {result['seconds']:.1f}s")
+    # Pruned trials rank after complete ones; their means cover fewer folds
+    return sorted(results, key=lambda r: (r['pruned'], -r['mean_ndcg@5']))
+
+
+def train_final(df, params, num_boost_round, num_threads=0):
+    """Fit ``params`` on every row for the cross-validated number of rounds.
+
+    No rows are held out, so the caller should clear ``evaluation_held_out``.
+    """
+    train_set = _dataset(sort_by_group(df))
+    return lgb.train({**BASE_PARAMS, **params, 'num_threads': num_threads}, train_set,
+                     num_boost_round=num_boost_round)
@@ -1,11 +1,130 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import LabelEncoder
 import lightgbm as lgb
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import GroupShuffleSplit
+import json
 import pickle
 import os
-from sklearn.metrics import ndcg_score
+from app.models.artifact import (
+    dataset_fingerprint, file_sha1, load_artifact, load_ingest_tables, save_artifact
+)
+from app.models.encoding import CategoryEncoder
+from app.models.evaluation import GroupedRanking
+from app.models.features import (
+    FEATURES, TARGET, CATEGORICAL_COLS, TRAINING_CATEGORICAL_FEATURES,
+    district_competition, stream_course_compatibility
+)
+
+# Columns of dataset.csv
+RAW_COLUMNS = ['Exam Year', 'District', 'University', 'Course', 'Zscore',
+               'Matched_Course_University', 'Stream', 'Intake']
+# Read as text in every chunk, whatever a chunk's values look like
+STRING_COLUMNS = ['Exam Year', 'District', 'University', 'Course', 'Matched_Course_University', 'Stream']
+
+# Rows per chunk when streaming the CSV; smaller files are read in one chunk
+CSV_CHUNK_ROWS = 100_000
+
+RANKER_PARAMS = {
+    'objective': 'lambdarank',
+    'metric': ['ndcg'],
+    'max_depth': 6,
+    'num_leaves': 31,
+    'learning_rate': 0.1,
+    'n_estimators': 1000,
+    'random_state': 42,
+    'verbose': 100,
+    'min_data_in_leaf': 5,
+    'min_gain_to_split': 0.0
+}
+
+# Columns kept in PredictionModel.df once the aggregates are built: what training,
+# evaluation and ingestion still read. Serving reads none of them.
+FRAME_COLUMNS = ['Exam_Year', 'District', 'Stream', 'group_id'] + FEATURES + [TARGET]
+CATEGORY_COLUMNS = ['Exam_Year', 'District', 'Stream', 'group_id']
+
+# NDCG cut-offs reported by evaluate_model
+EVALUATION_CUTOFFS = [1, 3, 5, 10]
+
+# Boosting rounds added per ingested batch when warm-starting
+WARM_START_ROUNDS = 50
+
+# Written next to the model file by save_model: the encoder classes the booster's codes refer to
+MODEL_META_SUFFIX = '.meta.json'
+
+# Aggregates over every loaded row; ingest() updates them in place
+AGGREGATE_TABLES = [
+    'course_zscore_sum', 'course_zscore_count', 'course_zscores', 'course_median_zscore',
+    'course_avg_zscore', 'course_demand', 'district_course_count', 'stream_course_count',
+    'course_popularity'
+]
+
+
+def sort_by_group(rows):
+    """LightGBM reads query groups as runs of consecutive rows."""
+    return rows.sort_values('group_id', kind='stable')
+
+
+def group_sizes(rows):
+    """Row count of each query group in ``rows``, in the order the groups first appear."""
+    return rows.groupby('group_id', sort=False, observed=True).size().values
+
+
+def compact_frame(df, categories=None):
+    """Keep FRAME_COLUMNS, with strings as categoricals and integers in their smallest dtype.
+
+    ``categories`` fixes the categories of some columns, so chunks compacted
+    separately can be concatenated without falling back to object dtype.
+    """
+    categories = categories or {}
+    df = df[FRAME_COLUMNS].copy()
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype(pd.CategoricalDtype(categories.get(col)))
+        elif pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    # Floats stay float64: training on rounded values would move the learned split thresholds
+    return df
+
+
+def read_csv_chunks(data_path, chunksize=CSV_CHUNK_ROWS):
+    """Yield the CSV in chunks of ``chunksize`` rows, checking each has RAW_COLUMNS."""
+    reader = pd.read_csv(data_path, chunksize=chunksize, dtype={col: str for col in STRING_COLUMNS})
+    with reader:
+        for chunk in reader:
+            missing = [col for col in RAW_COLUMNS if col not in chunk.columns]
+            if missing:
+                raise ValueError(f"{data_path}: missing columns: {', '.join(missing)}")
+            yield chunk
+
+
+def _split_groups(groups):
+    """Test-side mask over sorted ``groups``: the groups _train_test_split holds out.
+
+    GroupShuffleSplit draws from the sorted unique groups only, so one row
+    per group yields the same split as the whole frame.
+    """
+    splitter = GroupShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+    _, test_idx = next(splitter.split(groups, groups=groups))
+    mask = np.zeros(len(groups), dtype=bool)
+    mask[test_idx] = True
+    return mask
+
+
+def _group_ids(rows):
+    return rows['District'] + '_' + rows['Stream'] + '_' + rows['Exam_Year'].astype(str)
+
+
+def _course_coded(values, courses):
+    """``values`` indexed by codes of the ``courses`` CategoricalDtype instead of course names."""
+    return pd.Series(values.to_numpy(),
+                     index=pd.CategoricalIndex(values.index, dtype=courses, name=values.index.name))
+
+
+def _accumulate(total, part):
+    if total is None:
+        return part
+    return total.add(part, fill_value=0).astype(part.dtype)
+
 
 class PredictionModel:
     def __init__(self):
@@ -16,178 +135,490 @@ class PredictionModel:
         self.stream_course_count = None
         self.course_popularity = None
         self.course_demand = None  # New: Store demand scores
+        # Sufficient statistics behind course_avg_zscore and course_demand
+        self.course_zscore_sum = None
+        self.course_zscore_count = None
+        self.course_zscores = None
+        self.course_median_zscore = None
+        # Bundle load_artifact read, for the tables it leaves on disk
+        self.artifact_bundle = None
+        self.relevance_bins = None
         self.model = None
         self.test_data = None
         self.test_group_counts = None
+        # False once the booster was fit on the rows evaluate_model scores
+        self.evaluation_held_out = True
+        # Serving tables, filled by _build_serving_tables or load_artifact
+        self.latest_exam_year = None
+        self.intake_max = None
+        self.districts = None
+        self.streams = None
+        self.course_table = None
+        self.stream_candidates = None
+        # dataset_fingerprint of the CSV the tables were built from
+        self.data_source = None
+
+    def load_data(self, data_path, compact=True, chunksize=CSV_CHUNK_ROWS, encoders=None):
+        """Load and preprocess the CSV, reading it in chunks of ``chunksize`` rows.
 
-    def load_data(self, data_path):
-        self.df = pd.read_csv(data_path)
-        self._preprocess_data()
+        ``compact`` shrinks the kept frame (see compact_frame); each chunk is
+        compacted before the next is read. ``encoders`` (column ->
+        CategoryEncoder) are extended with the CSV's new classes instead of
+        fitting fresh ones, so a booster trained with them keeps its codes.
+        """
+        scan = self._scan(data_path, chunksize, encoders)
+        categories = self._frame_categories(scan)
+        parts = [compact_frame(rows, categories) if compact else rows
+                 for rows in self._feature_chunks(data_path, chunksize, scan)]
+        self.df = pd.concat(parts)
+        if compact:
+            for col in CATEGORY_COLUMNS:
+                self.df[col] = self.df[col].cat.remove_unused_categories()
+
+    def _scan(self, data_path, chunksize, encoders=None):
+        """First pass: everything computed over all rows, accumulated chunk by chunk.
+
+        Fills the aggregate tables, relevance bins and encoders, and returns
+        the z-score percentile of every row, the row count of every query
+        group and the largest intake. Only the z-scores are kept per row.
+        """
+        for name in AGGREGATE_TABLES:
+            setattr(self, name, None)
+        self.data_source = dataset_fingerprint(data_path)
+        self.artifact_bundle = None
+        zscores, scored, group_counts, intake_max = [], [], None, 0
+        uniques = {col: [] for col in CATEGORICAL_COLS}
+        for chunk in read_csv_chunks(data_path, chunksize):
+            rows = self._clean(chunk)
+            rows['is_NQC'] = rows['Zscore_Values'] == -10
+            zscores.append(rows['Zscore_Values'].to_numpy())
+            scored.append(self._update_counts(rows))
+            for col in CATEGORICAL_COLS:
+                uniques[col].append(pd.unique(rows[col]))
+            group_counts = _accumulate(group_counts, _group_ids(rows).value_counts())
+            intake_max = max(intake_max, rows['Intake'].fillna(0).max())
+        if not zscores:
+            raise ValueError(f"{data_path} has no rows")
+        courses = pd.CategoricalDtype(self.course_zscore_count.index)
+        self._update_medians(pd.concat([_course_coded(part, courses) for part in scored]))
+
+        # Discretize Zscore_Values
+        zscores = pd.Series(np.concatenate(zscores))
+        self.relevance_bins = [-float('inf'), zscores.quantile(0.25), zscores.quantile(0.50),
+                               zscores.quantile(0.75), zscores.quantile(0.90), float('inf')]
+        encoders = encoders or {}
+        self.label_encoders = {
+            col: encoders[col].extend(np.concatenate(values))[0] if col in encoders
+            else CategoryEncoder.fit(np.concatenate(values))[0]
+            for col, values in uniques.items()
+        }
+        return zscores.rank(pct=True).to_numpy(), group_counts, intake_max
 
-    def _preprocess_data(self):
+    def _feature_chunks(self, data_path, chunksize, scan):
+        """Second pass: yield each chunk's rows with every feature column, dropping one-row groups.
+
+        Also rebuilds the serving tables from the kept rows.
+        """
+        percentile, group_counts, intake_max = scan
+        self.course_table = None
+        self.stream_candidates = None
+        start = 0
+        for chunk in read_csv_chunks(data_path, chunksize):
+            rows = self._clean(chunk)
+            rows['Zscore_Relevance'] = self._relevance(rows['Zscore_Values'])
+            rows['zscore_percentile'] = percentile[start:start + len(rows)]
+            start += len(rows)
+            self._add_aggregate_features(rows)
+            rows['Intake'] = rows['Intake'].fillna(0)
+            rows['intake_normalized'] = rows['Intake'] / intake_max
+
+            # Encode categorical features
+            for col in CATEGORICAL_COLS:
+                rows[col + '_encoded'] = self.label_encoders[col].transform(rows[col]).astype(np.int64)
+
+            rows = self._filter_groups(rows, group_counts)
+            if len(rows):
+                self._update_serving_tables(rows)
+                yield rows
+
+    def _frame_categories(self, scan):
+        """Categories of every CATEGORY_COLUMNS column, so compacted chunks concatenate."""
+        group_counts = scan[1]
+        return {
+            'Exam_Year': self.label_encoders['Exam_Year'].classes_,
+            'District': self.label_encoders['District'].classes_,
+            'Stream': self.label_encoders['Stream'].classes_,
+            'group_id': np.sort(group_counts.index[group_counts >= 2].to_numpy())
+        }
+
+    @staticmethod
+    def _clean(df):
         # Rename column
-        self.df = self.df.rename(columns={'Exam Year': 'Exam_Year'})
+        df = df.rename(columns={'Exam Year': 'Exam_Year'})
 
         # Handle NaN values in categorical columns
         categorical_cols = ['Exam_Year', 'District', 'Stream', 'Course', 'University']
         for col in categorical_cols:
-            self.df[col] = self.df[col].fillna('Missing').astype(str)
+            df[col] = df[col].fillna('Missing').astype(str)
 
         # Clean Zscore column
-        self.df['Zscore_Values'] = pd.to_numeric(self.df['Zscore'], errors='coerce').fillna(-10)
+        df['Zscore_Values'] = pd.to_numeric(df['Zscore'], errors='coerce').fillna(-10)
+        # Unparseable intakes count as missing
+        df['Intake'] = pd.to_numeric(df['Intake'], errors='coerce')
+        return df
 
-        # Discretize Zscore_Values
-        bins = [-float('inf'), self.df['Zscore_Values'].quantile(0.25), 
-                self.df['Zscore_Values'].quantile(0.50),
-                self.df['Zscore_Values'].quantile(0.75), 
-                self.df['Zscore_Values'].quantile(0.90), float('inf')]
+    def _relevance(self, zscores):
         labels = [0, 1, 2, 3, 4]
-        self.df['Zscore_Relevance'] = pd.cut(self.df['Zscore_Values'], bins=bins, 
-                                          labels=labels, include_lowest=True).astype(int)
+        return pd.cut(zscores, bins=self.relevance_bins, labels=labels, include_lowest=True).astype(int)
+
+    def _update_aggregates(self, rows):
+        """Fold ``rows`` into the per-course tables; tables that are None start from these rows alone.
+
+        The mean comes from running sums and counts and the median from the
+        kept per-course values, so only courses present in ``rows`` are
+        recomputed.
+        """
+        self._update_medians(self._update_counts(rows))
 
-        # Calculate features
-        self.df['zscore_percentile'] = self.df['Zscore_Values'].rank(pct=True)
-        
+    def _update_counts(self, rows):
+        """Fold ``rows`` into every table but the medians; returns their scored z-scores by course."""
         # Calculate course demand based on median Z-score (excluding -10)
-        self.course_avg_zscore = self.df[self.df['Zscore_Values'] != -10].groupby(
-            'Matched_Course_University')['Zscore_Values'].mean()
-        self.course_demand = self.df[self.df['Zscore_Values'] != -10].groupby(
-            'Matched_Course_University')['Zscore_Values'].median()
-        self.course_demand = (self.course_demand - self.course_demand.min()) / (
-            self.course_demand.max() - self.course_demand.min() + 1e-10)  # Normalize to [0,1]
-        
-        self.df['zscore_vs_course_avg'] = self.df['Zscore_Values'] - self.df['Matched_Course_University'].map(
-            self.course_avg_zscore).fillna(0)
-        self.df['course_demand'] = self.df['Matched_Course_University'].map(self.course_demand).fillna(0)
-        
-        self.district_course_count = self.df.groupby(['District', 'Matched_Course_University']).size()
-        self.df['district_competition'] = self.df.apply(
-            lambda x: self.district_course_count.get((x['District'], x['Matched_Course_University']), 0), axis=1)
-        
-        self.stream_course_count = self.df.groupby(['Stream', 'Matched_Course_University']).size()
-        def calculate_stream_compatibility(row):
-            stream = row['Stream']
-            course = row['Matched_Course_University']
-            if stream == 'Cross Stream':
-                return sum(self.stream_course_count.get((s, course), 0) 
-                          for s in ['Arts', 'Commerce', 'Biological Science', 
-                                    'Physical Science', 'Engineering Technology', 
-                                    'Biosystems Technology', 'Cross Stream'])
-            return self.stream_course_count.get((stream, course), 0)
-        
-        self.df['stream_course_compatibility'] = self.df.apply(calculate_stream_compatibility, axis=1)
-        
-        self.course_popularity = self.df['Matched_Course_University'].value_counts()
-        self.df['course_popularity'] = self.df['Matched_Course_University'].map(self.course_popularity)
-        
-        self.df['Intake'] = self.df['Intake'].fillna(0)
-        self.df['intake_normalized'] = self.df['Intake'] / self.df['Intake'].max()
-        
-        self.df['is_NQC'] = self.df['Zscore_Values'] == -10
-
-        # Encode categorical features
-        categorical_cols = ['Exam_Year', 'District', 'Stream', 'Course', 'University', 'is_NQC']
-        for col in categorical_cols:
-            le = LabelEncoder()
-            self.df[col + '_encoded'] = le.fit_transform(self.df[col])
-            self.label_encoders[col] = le
+        scored = rows[rows['Zscore_Values'] != -10]
+        by_course = scored.groupby('Matched_Course_University')['Zscore_Values']
+        self.course_zscore_sum = _accumulate(self.course_zscore_sum, by_course.sum())
+        self.course_zscore_count = _accumulate(self.course_zscore_count, by_course.size())
+        self.course_avg_zscore = self.course_zscore_sum / self.course_zscore_count
+
+        self.district_course_count = _accumulate(
+            self.district_course_count, rows.groupby(['District', 'Matched_Course_University']).size())
+        self.stream_course_count = _accumulate(
+            self.stream_course_count, rows.groupby(['Stream', 'Matched_Course_University']).size())
+        self.course_popularity = _accumulate(
+            self.course_popularity, rows['Matched_Course_University'].value_counts())
+        # A course code per row rather than its name
+        return pd.Series(scored['Zscore_Values'].to_numpy(),
+                         index=pd.CategoricalIndex(scored['Matched_Course_University']))
+
+    def _update_medians(self, new_values):
+        """Add ``new_values`` (z-scores by course) and recompute the medians of the courses they touch.
 
+        The kept values are indexed by codes into course_zscore_count's courses
+        (every scored course), about 10 bytes per scored row.
+        """
+        courses = pd.CategoricalDtype(self.course_zscore_count.index)
+        new_values = _course_coded(new_values, courses)
+        values = new_values
+        if self.course_zscores is not None:
+            values = pd.concat([_course_coded(self.course_zscores, courses), new_values])
+        self.course_zscores = values
+        touched = values[np.isin(values.index.codes, np.unique(new_values.index.codes))]
+        medians = touched.groupby(level=0, observed=True).median()
+        medians.index = pd.Index(medians.index.astype(object), name=medians.index.name)
+        if self.course_median_zscore is not None:
+            medians = medians.combine_first(self.course_median_zscore)
+        self.course_median_zscore = medians
+        self.course_demand = (medians - medians.min()) / (
+            medians.max() - medians.min() + 1e-10)  # Normalize to [0,1]
+
+    def _add_aggregate_features(self, rows):
+        matched = rows['Matched_Course_University']
+        rows['zscore_vs_course_avg'] = rows['Zscore_Values'] - matched.map(self.course_avg_zscore).fillna(0)
+        rows['course_demand'] = matched.map(self.course_demand).fillna(0)
+        rows['district_competition'] = district_competition(
+            rows['District'], matched, self.district_course_count)
+        rows['stream_course_compatibility'] = stream_course_compatibility(
+            rows['Stream'], matched, self.stream_course_count)
+        rows['course_popularity'] = matched.map(self.course_popularity)
+        rows['is_NQC'] = rows['Zscore_Values'] == -10
+
+    @staticmethod
+    def _filter_groups(rows, group_counts=None):
+        """Add group_id and drop groups of one row, counted in ``group_counts`` or else in ``rows``."""
         # Create group ID
-        self.df['group_id'] = self.df['District'] + '_' + self.df['Stream'] + '_' + self.df['Exam_Year'].astype(str)
-        
+        rows['group_id'] = _group_ids(rows)
+
         # Filter groups
-        group_sizes = self.df.groupby('group_id').size()
-        valid_groups = group_sizes[group_sizes >= 2].index
-        self.df = self.df[self.df['group_id'].isin(valid_groups)]
+        if group_counts is None:
+            group_counts = rows.groupby('group_id').size()
+        valid_groups = group_counts[group_counts >= 2].index
+        return rows[rows['group_id'].isin(valid_groups)]
+
+    def _update_serving_tables(self, rows):
+        # Everything recommendation requests need from the frame, so serving can run without it
+        if self.course_table is None:
+            self.latest_exam_year = rows['Exam_Year'].max()
+            self.intake_max = rows['Intake'].max()
+            self.districts = rows['District'].unique().tolist()
+            self.streams = rows['Stream'].unique().tolist()
+            self.course_table = rows.groupby('Matched_Course_University')[['Course', 'University', 'Intake']].first()
+            self.stream_candidates = {
+                stream: stream_df[['Course', 'University']].drop_duplicates().reset_index(drop=True)
+                for stream, stream_df in rows.groupby('Stream', sort=False)
+            }
+            return
+
+        # Same tables as building from old and new rows together, in the same order
+        self.latest_exam_year = max(self.latest_exam_year, rows['Exam_Year'].max())
+        self.intake_max = max(self.intake_max, rows['Intake'].max())
+        self.districts += [d for d in rows['District'].unique() if d not in self.districts]
+        self.streams += [s for s in rows['Stream'].unique() if s not in self.streams]
+        self.course_table = self.course_table.combine_first(
+            rows.groupby('Matched_Course_University')[['Course', 'University', 'Intake']].first())
+        for stream, stream_df in rows.groupby('Stream', sort=False):
+            pairs = stream_df[['Course', 'University']]
+            if stream in self.stream_candidates:
+                pairs = pd.concat([self.stream_candidates[stream], pairs])
+            self.stream_candidates[stream] = pairs.drop_duplicates().reset_index(drop=True)
+
+    def write_training_data(self, data_path, output_dir, chunksize=CSV_CHUNK_ROWS):
+        """Stream the CSV into LightGBM binary Datasets for ``train_from_binary``, without a frame.
+
+        Rows are scattered chunk by chunk into a memory-mapped feature matrix
+        laid out as the train groups then the held-out groups, each sorted by
+        group_id (the order sort_by_group gives the frame). ``output_dir`` then
+        holds train.bin, valid.bin and dataset.json. The aggregate, encoder
+        and serving tables are filled as by ``load_data``; ``df`` stays None.
+        """
+        scan = self._scan(data_path, chunksize)
+        group_counts = scan[1]
+        group_counts = group_counts[group_counts >= 2].sort_index()
+        held_out = _split_groups(group_counts.index.to_numpy())
+        # Train groups first, then held-out groups, each in group_id order
+        order = np.r_[np.flatnonzero(~held_out), np.flatnonzero(held_out)]
+        groups = group_counts.index[order]
+        sizes = group_counts.to_numpy()[order]
+        offsets = np.r_[0, np.cumsum(sizes)[:-1]]
+        num_rows = int(sizes.sum())
+        num_train = int(sizes[:(~held_out).sum()].sum())
+
+        os.makedirs(output_dir, exist_ok=True)
+        features_path = os.path.join(output_dir, 'features.npy')
+        features = np.lib.format.open_memmap(features_path, mode='w+', dtype=np.float64,
+                                             shape=(num_rows, len(FEATURES)))
+        labels = np.empty(num_rows, dtype=np.int8)
+        written = np.zeros(len(groups), dtype=np.int64)
+        self.df = None
+        for rows in self._feature_chunks(data_path, chunksize, scan):
+            codes = pd.Categorical(rows['group_id'], categories=groups).codes
+            # Stable within each group: rows keep their file order
+            within = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+            positions = offsets[codes] + written[codes] + within
+            features[positions] = rows[FEATURES].to_numpy(dtype=np.float64)
+            labels[positions] = rows[TARGET].to_numpy()
+            written += np.bincount(codes, minlength=len(groups))
+        features.flush()
+
+        num_train_groups = int((~held_out).sum())
+        train_set = lgb.Dataset(
+            features[:num_train], label=labels[:num_train], group=sizes[:num_train_groups],
+            feature_name=FEATURES, categorical_feature=TRAINING_CATEGORICAL_FEATURES, free_raw_data=True)
+        valid_set = lgb.Dataset(
+            features[num_train:], label=labels[num_train:], group=sizes[num_train_groups:],
+            reference=train_set, free_raw_data=True)
+        train_set.construct()
+        valid_set.construct()
+        for dataset, name in [(train_set, 'train.bin'), (valid_set, 'valid.bin')]:
+            # LightGBM will not overwrite an existing binary
+            path = os.path.join(output_dir, name)
+            if os.path.exists(path + '.tmp'):
+                os.remove(path + '.tmp')
+            dataset.save_binary(path + '.tmp')
+            os.replace(path + '.tmp', path)
+        del features, train_set, valid_set
+        # The binaries hold everything training needs
+        os.remove(features_path)
+
+        manifest = {
+            'source': os.path.abspath(data_path),
+            'rows': num_rows,
+            'train_rows': num_train,
+            'valid_rows': num_rows - num_train,
+            'train_groups': num_train_groups,
+            'valid_groups': len(groups) - num_train_groups,
+            'features': FEATURES
+        }
+        with open(os.path.join(output_dir, 'dataset.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def train_from_binary(self, dataset_dir, model_path):
+        """Train as ``train_model`` does, from the Datasets written by ``write_training_data``."""
+        train_set = lgb.Dataset(os.path.join(dataset_dir, 'train.bin'))
+        valid_set = lgb.Dataset(os.path.join(dataset_dir, 'valid.bin'), reference=train_set)
+        params = {k: v for k, v in RANKER_PARAMS.items() if k != 'n_estimators'}
+        self.model = lgb.train(
+            {**params, 'eval_at': [5]}, train_set, num_boost_round=RANKER_PARAMS['n_estimators'],
+            valid_sets=[valid_set], callbacks=[lgb.early_stopping(stopping_rounds=50, verbose=True)]
+        )
+        self.evaluation_held_out = True
+        self.save_model(model_path)
+
+    def ingest(self, raw_rows):
+        """Add the rows of new exam years without reprocessing the years already loaded.
+
+        Updates the aggregate, encoder and serving tables in place and returns
+        the new rows with their feature columns, ready for ``warm_start``.
+        """
+        missing = [col for col in RAW_COLUMNS if col not in raw_rows.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+        rows = self._clean(raw_rows.copy())
+        known_years = sorted(set(rows['Exam_Year']) & set(self.label_encoders['Exam_Year'].classes_.tolist()))
+        if known_years:
+            raise ValueError(f"Exam years already ingested: {', '.join(known_years)}")
+
+        rows['Zscore_Relevance'] = self._relevance(rows['Zscore_Values'])
+        # Ranked within the new rows; serving uses a fixed value for this feature
+        rows['zscore_percentile'] = rows['Zscore_Values'].rank(pct=True)
+
+        self._load_ingest_tables()
+        self._update_aggregates(rows)
+        self._add_aggregate_features(rows)
+        rows['Intake'] = rows['Intake'].fillna(0)
+        self.intake_max = max(self.intake_max, rows['Intake'].max())
+        rows['intake_normalized'] = rows['Intake'] / self.intake_max
+
+        # Unseen values get new codes after the existing ones, so the booster's codes stay valid
+        for col in CATEGORICAL_COLS:
+            encoder, codes = self.label_encoders[col].extend(rows[col])
+            rows[col + '_encoded'] = codes
+            self.label_encoders[col] = encoder
+
+        rows = self._filter_groups(rows)
+        self._update_serving_tables(rows)
+        if self.df is not None:
+            frame = pd.concat([self.df, rows[self.df.columns]], ignore_index=True)
+            self.df = compact_frame(frame) if len(self.df.columns) == len(FRAME_COLUMNS) else frame
+            self.test_data = None
+        return rows
+
+    def warm_start(self, rows, model_path, num_boost_round=WARM_START_ROUNDS):
+        """Continue boosting the current model on ``rows`` (as returned by ``ingest``)."""
+        rows = sort_by_group(rows)
+        train_dataset = lgb.Dataset(
+            data=rows[FEATURES],
+            label=rows[TARGET],
+            group=group_sizes(rows),
+            categorical_feature=TRAINING_CATEGORICAL_FEATURES
+        )
+        params = {k: v for k, v in RANKER_PARAMS.items() if k != 'n_estimators'}
+        self.model = lgb.train(
+            params, train_dataset, num_boost_round=num_boost_round,
+            init_model=getattr(self.model, 'booster_', self.model)
+        )
+        # The new rows are boosted on whichever side of the split their groups fall
+        self.evaluation_held_out = False
+        self.save_model(model_path)
 
     def train_model(self, model_path):
-        features = [
-            'Exam_Year_encoded', 'District_encoded', 'Stream_encoded', 'Course_encoded', 
-            'University_encoded', 'Zscore_Values', 'zscore_percentile', 
-            'zscore_vs_course_avg', 'district_competition', 'stream_course_compatibility', 
-            'course_popularity', 'intake_normalized', 'is_NQC_encoded', 'course_demand'
-        ]
-        target = 'Zscore_Relevance'
-
-        train_data, test_data = train_test_split(self.df, test_size=0.2, random_state=42)
-        train_group_counts = train_data.groupby('group_id').size().values
+        train_data, test_data = self._train_test_split()
+        train_group_counts = group_sizes(train_data)
         self.test_data = test_data.reset_index(drop=True)
-        self.test_group_counts = test_data.groupby('group_id').size().values
+        self.test_group_counts = group_sizes(test_data)
 
         train_dataset = lgb.Dataset(
-            data=train_data[features],
-            label=train_data[target],
+            data=train_data[FEATURES],
+            label=train_data[TARGET],
             group=train_group_counts,
-            categorical_feature=[0, 1, 2, 3, 4, 12]
+            categorical_feature=TRAINING_CATEGORICAL_FEATURES
         )
 
-        params = {
-            'objective': 'lambdarank',
-            'metric': ['ndcg'],
-            'max_depth': 6,
-            'num_leaves': 31,
-            'learning_rate': 0.1,
-            'n_estimators': 1000,
-            'random_state': 42,
-            'verbose': 100,
-            'min_data_in_leaf': 5,
-            'min_gain_to_split': 0.0
-        }
-
-        self.model = lgb.LGBMRanker(**params)
+        self.model = lgb.LGBMRanker(**RANKER_PARAMS)
         self.model.fit(
-            X=train_data[features],
-            y=train_data[target],
+            X=train_data[FEATURES],
+            y=train_data[TARGET],
             group=train_group_counts,
-            eval_set=[(test_data[features], test_data[target])],
+            categorical_feature=TRAINING_CATEGORICAL_FEATURES,
+            eval_set=[(test_data[FEATURES], test_data[TARGET])],
             eval_group=[self.test_group_counts],
             eval_metric=['ndcg'],
             eval_at=[5],
             callbacks=[lgb.early_stopping(stopping_rounds=50, verbose=True)]
         )
+        self.evaluation_held_out = True
+
+        self.save_model(model_path)
+
+    def save_model(self, model_path):
+        """Write the booster to ``model_path`` and its encoder classes and held-out flag next to it."""
+        getattr(self.model, 'booster_', self.model).save_model(model_path)
+        meta = {
+            # Ties the metadata to this exact booster; a replaced model file ignores it
+            'booster_sha1': file_sha1(model_path),
+            'encoders': {col: self.label_encoders[col].classes_.tolist() for col in CATEGORICAL_COLS},
+            'evaluation_held_out': self.evaluation_held_out
+        }
+        with open(model_path + MODEL_META_SUFFIX + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(model_path + MODEL_META_SUFFIX + '.tmp', model_path + MODEL_META_SUFFIX)
 
-        self.model.booster_.save_model(model_path)
-        
     def load_model(self, model_path):
+        """Load the booster, and what save_model recorded about its training when it matches."""
         self.model = lgb.Booster(model_file=model_path)
-        features = [
-            'Exam_Year_encoded', 'District_encoded', 'Stream_encoded', 'Course_encoded', 
-            'University_encoded', 'Zscore_Values', 'zscore_percentile', 
-            'zscore_vs_course_avg', 'district_competition', 'stream_course_compatibility', 
-            'course_popularity', 'intake_normalized', 'is_NQC_encoded', 'course_demand'
-        ]
-        _, self.test_data = train_test_split(self.df, test_size=0.2, random_state=42)
+        meta = self._model_meta(model_path)
+        if meta is not None:
+            self.label_encoders = {col: CategoryEncoder(np.asarray(classes, dtype=object))
+                                   for col, classes in meta['encoders'].items()}
+            self.evaluation_held_out = meta.get('evaluation_held_out', True)
+
+    @staticmethod
+    def _model_meta(model_path):
+        try:
+            with open(model_path + MODEL_META_SUFFIX) as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        return meta if meta.get('booster_sha1') == file_sha1(model_path) else None
+
+    def save_artifact(self, artifact_path):
+        self._load_ingest_tables()
+        save_artifact(self, artifact_path)
+
+    def load_artifact(self, artifact_path):
+        return load_artifact(self, artifact_path)
+
+    def _load_ingest_tables(self):
+        if self.course_zscores is None and self.artifact_bundle is not None:
+            load_ingest_tables(self, self.artifact_bundle)
+
+    def _train_test_split(self):
+        # Whole query groups go to one side, and each side is sorted so its groups are contiguous
+        splitter = GroupShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+        train_idx, test_idx = next(splitter.split(self.df, groups=self.df['group_id']))
+        return (sort_by_group(self.df.iloc[train_idx]), sort_by_group(self.df.iloc[test_idx]))
+
+    def _split_test_data(self):
+        # Same split as train_model, rebuilt on demand instead of on every model load
+        _, self.test_data = self._train_test_split()
         self.test_data = self.test_data.reset_index(drop=True)
-        self.test_group_counts = self.test_data.groupby('group_id').size().values
+        self.test_group_counts = group_sizes(self.test_data)
 
     def evaluate_model(self):
+        if self.test_data is None and self.df is not None:
+            self._split_test_data()
         if self.test_data is None or self.model is None:
             raise ValueError("Model and test data must be available. Train or load the model first.")
-        
-        features = [
-            'Exam_Year_encoded', 'District_encoded', 'Stream_encoded', 'Course_encoded', 
-            'University_encoded', 'Zscore_Values', 'zscore_percentile', 
-            'zscore_vs_course_avg', 'district_competition', 'stream_course_compatibility', 
-            'course_popularity', 'intake_normalized', 'is_NQC_encoded', 'course_demand'
-        ]
-        target = 'Zscore_Relevance'
-
-        predictions = self.model.predict(self.test_data[features])
-        test_groups = self.test_data.groupby('group_id')
-        ndcg_scores = []
-        
-        for group_id, group_data in test_groups:
-            true_relevance = group_data[target].values
-            group_indices = group_data.index - self.test_data.index[0]
-            pred_scores = predictions[group_indices]
-            
-            if len(true_relevance) >= 2:
-                ndcg = ndcg_score([true_relevance], [pred_scores], k=5)
-                ndcg_scores.append(ndcg)
-        
-        avg_ndcg = np.mean(ndcg_scores) if ndcg_scores else 0.0
-        
+
+        predictions = self.model.predict(self.test_data[FEATURES])
+        ranking = GroupedRanking(self.test_data['group_id'], self.test_data[TARGET], predictions)
+
+        # Only groups with at least two rows can be ranked
+        groups = pd.DataFrame({
+            'Stream': self.test_data['Stream'].to_numpy()[ranking.group_rows],
+            'Exam_Year': self.test_data['Exam_Year'].to_numpy()[ranking.group_rows],
+            **{f'NDCG@{k}': ranking.ndcg(k) for k in EVALUATION_CUTOFFS},
+            'MAP': ranking.average_precision()
+        })[ranking.group_sizes >= 2]
+        metrics = [f'NDCG@{k}' for k in EVALUATION_CUTOFFS] + ['MAP']
+
+        def summary(frame):
+            # MAP skips groups without any relevant row
+            return {**{name: float(frame[name].mean()) if len(frame) else 0.0 for name in metrics},
+                    'num_groups_evaluated': len(frame)}
+
         return {
-            'NDCG@5': avg_ndcg,
-            'num_groups_evaluated': len(ndcg_scores)
-        }
\ No newline at end of file
+            **summary(groups),
+            'held_out': self.evaluation_held_out,
+            'by_stream': {stream: summary(frame) for stream, frame in groups.groupby('Stream')},
+            'by_exam_year': {year: summary(frame) for year, frame in groups.groupby('Exam_Year')}
+        }
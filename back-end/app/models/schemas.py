@@ -1,10 +1,13 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+from app import config
 
 class StudentInput(BaseModel):
     district: str
     stream: str
-    zscore: float
+    # NaN and infinity cannot be quantized into a cache key
+    zscore: float = Field(allow_inf_nan=False)
 
 class CourseRecommendation(BaseModel):
     course: str
@@ -13,4 +16,54 @@ class CourseRecommendation(BaseModel):
     demand_score: float 
 
 class RecommendationResponse(BaseModel):
-    recommendations: List[CourseRecommendation]
\ No newline at end of file
+    recommendations: List[CourseRecommendation]
+
+class BatchStudentInput(BaseModel):
+    students: List[StudentInput] = Field(max_length=config.BATCH_MAX_STUDENTS)
+    cross_stream: bool = False
+    top_k: Optional[int] = Field(None, ge=1)
+    min_score: Optional[float] = None
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[RecommendationResponse]
+
+class CombinedRecommendationResponse(BaseModel):
+    recommendations: List[CourseRecommendation]
+    cross_stream_recommendations: List[CourseRecommendation]
+    total: int
+    cross_stream_total: int
+
+class WhatIfInput(BaseModel):
+    district: str
+    stream: str
+    # NaN and infinity have no grid point
+    from_zscore: float = Field(allow_inf_nan=False)
+    to_zscore: float = Field(allow_inf_nan=False)
+    cross_stream: bool = False
+
+class RankedCourse(BaseModel):
+    course: str
+    university: str
+    rank: int
+    predicted_score: float
+
+class RankChange(BaseModel):
+    course: str
+    university: str
+    from_rank: int
+    to_rank: int
+
+class WhatIfResponse(BaseModel):
+    # Grid z-scores the answer was computed at (each input rounded down to the grid)
+    from_zscore: float
+    to_zscore: float
+    opened: List[RankedCourse]
+    closed: List[RankedCourse]
+    moved: List[RankChange]
+
+class ModelLoadRequest(BaseModel):
+    # Artifact directory or symlink under DATA_DIR; defaults to the serving artifact
+    artifact_path: Optional[str] = None
+    slot: Literal['primary', 'canary'] = 'primary'
+    # Share of recommendation traffic for a canary load (keeps the current share when omitted)
+    traffic_percent: Optional[float] = Field(None, ge=0, le=100)
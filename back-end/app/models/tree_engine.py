@@ -0,0 +1,163 @@
+"""Pure NumPy scoring of a trained LightGBM ranker.
+
+For the few hundred candidate rows of a single recommendation request,
+``Booster.predict`` is dominated by fixed per-call overhead. ``CompiledRanker``
+flattens every tree of the booster into parallel node arrays and walks all
+trees for all rows at once, one tree level per step. ``InferenceEngine``
+picks between the two depending on batch size.
+"""
+import numpy as np
+
+# LightGBM's kZeroThreshold: |x| below this counts as zero for missing_type 'Zero'
+ZERO_THRESHOLD = 1e-35
+
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+MISSING_TYPES = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+
+
+class CompiledRanker:
+    def __init__(self, booster):
+        dump = booster.dump_model()
+        if dump['num_tree_per_iteration'] != 1:
+            raise ValueError("Only single-output boosters can be compiled")
+        if dump.get('average_output'):
+            raise ValueError("Averaged (random forest) boosters are not supported")
+
+        self.num_features = dump['max_feature_idx'] + 1
+        # Split and leaf nodes share one id space; leaves point to themselves so
+        # a fixed number of steps (the deepest path) settles every row on a leaf.
+        feature, threshold, default_left, missing_type = [], [], [], []
+        categories, left, right, value = [], [], [], []
+        roots = []
+        self.max_depth = 0
+
+        for tree in dump['tree_info']:
+            if tree.get('is_linear'):
+                raise ValueError("Linear trees are not supported")
+            roots.append(len(feature))
+            stack = [(tree['tree_structure'], None, None, 0)]
+            while stack:
+                node, parent, side, depth = stack.pop()
+                node_id = len(feature)
+                if parent is not None:
+                    (left if side == 'left' else right)[parent] = node_id
+                is_split = 'split_index' in node
+                is_categorical = is_split and node['decision_type'] == '=='
+
+                feature.append(node['split_feature'] if is_split else 0)
+                threshold.append(node['threshold'] if is_split and not is_categorical else 0.0)
+                categories.append(
+                    [int(c) for c in str(node['threshold']).split('||')] if is_categorical else None)
+                default_left.append(node['default_left'] if is_split else True)
+                missing_type.append(MISSING_TYPES[node['missing_type']] if is_split else MISSING_NONE)
+                left.append(node_id)
+                right.append(node_id)
+                value.append(0.0 if is_split else node['leaf_value'])
+
+                if is_split:
+                    stack.append((node['right_child'], node_id, 'right', depth + 1))
+                    stack.append((node['left_child'], node_id, 'left', depth + 1))
+                else:
+                    self.max_depth = max(self.max_depth, depth)
+
+        self.num_nodes = len(feature)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.missing_type = np.asarray(missing_type, dtype=np.int8)
+        self.value = np.asarray(value, dtype=np.float64)
+        # children[2 * node + go_left] is the next node
+        self.children = np.stack([np.asarray(right), np.asarray(left)], axis=1).ravel().astype(np.int64)
+
+        self.handles_missing = bool((self.missing_type != MISSING_NONE).any())
+
+        # Categorical splits: node -> row of a dense membership table (-1 for numerical nodes)
+        self.categorical_nodes = np.asarray(
+            [i for i, c in enumerate(categories) if c is not None], dtype=np.int64)
+        self.category_row = np.full(self.num_nodes, -1, dtype=np.int64)
+        self.category_row[self.categorical_nodes] = np.arange(len(self.categorical_nodes))
+        width = max((max(categories[i]) for i in self.categorical_nodes), default=-1) + 1
+        self.category_table = np.zeros((len(self.categorical_nodes), width), dtype=bool)
+        for row, node_id in enumerate(self.categorical_nodes):
+            self.category_table[row, categories[node_id]] = True
+
+    @property
+    def num_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != self.num_features:
+            raise ValueError(f"Expected a 2-d array with {self.num_features} columns")
+
+        num_rows = X.shape[0]
+        flat_X = X.ravel()
+        row_offsets = np.arange(num_rows, dtype=np.int64) * self.num_features
+        exact = not self.handles_missing and not len(self.categorical_nodes) and not np.isnan(flat_X).any()
+
+        # (trees, rows) so the final reduction adds trees in order, as LightGBM does
+        nodes = np.repeat(self.roots[:, None], num_rows, axis=1)
+        for _ in range(self.max_depth):
+            values = flat_X[self.feature[nodes] + row_offsets]
+            if exact:
+                go_left = values <= self.threshold[nodes]
+            else:
+                go_left = self._go_left(nodes, values)
+            nodes = self.children[2 * nodes + go_left]
+
+        return np.add.reduce(self.value[nodes], axis=0)
+
+    def _go_left(self, nodes, values):
+        # LightGBM Tree::NumericalDecision
+        missing_type = self.missing_type[nodes]
+        is_nan = np.isnan(values)
+        numeric = np.where(is_nan & (missing_type != MISSING_NAN), 0.0, values)
+        use_default = (
+            ((missing_type == MISSING_ZERO) & (np.abs(numeric) <= ZERO_THRESHOLD))
+            | ((missing_type == MISSING_NAN) & is_nan)
+        )
+        go_left = np.where(use_default, self.default_left[nodes], numeric <= self.threshold[nodes])
+
+        # LightGBM Tree::CategoricalDecision
+        category_rows = self.category_row[nodes]
+        categorical = category_rows >= 0
+        if categorical.any():
+            cat_values = values[categorical]
+            cat_rows = category_rows[categorical]
+            cat_nan = np.isnan(cat_values)
+            codes = np.where(cat_nan, 0, np.nan_to_num(cat_values)).astype(np.int64)
+            in_range = (codes >= 0) & (codes < self.category_table.shape[1])
+            member = np.zeros(len(codes), dtype=bool)
+            member[in_range] = self.category_table[cat_rows[in_range], codes[in_range]]
+            # NaN always goes right, whatever the node's missing type
+            member[cat_nan] = False
+            go_left[categorical] = member
+
+        return go_left
+
+
+class InferenceEngine:
+    """Scores with CompiledRanker for small batches and the Booster otherwise.
+
+    The compiled walk costs roughly rows x trees x depth array operations, so
+    the cut-over is expressed as a budget of rows x trees.
+    """
+
+    def __init__(self, booster, compiled: bool = True, max_compiled_cells: int = 4096,
+                 num_threads: int = 0):
+        self.booster = booster
+        self.max_compiled_cells = max_compiled_cells
+        # 0 lets LightGBM use OpenMP's default thread count
+        self.num_threads = num_threads
+        self.compiled = None
+        if compiled:
+            try:
+                self.compiled = CompiledRanker(booster)
+            except ValueError:
+                self.compiled = None
+
+    def predict(self, X):
+        if self.compiled is not None and len(X) * self.compiled.num_trees <= self.max_compiled_cells:
+            return self.compiled.predict(X)
+        return self.booster.predict(X, num_threads=self.num_threads)
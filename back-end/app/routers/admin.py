@@ -0,0 +1,99 @@
+import asyncio
+import hmac
+import os
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from typing import Optional
+from app.dependencies import get_ml_service
+from app.models.schemas import ModelLoadRequest
+from app.services.ml_service import MLService
+from app import config
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Closed unless a token is configured: these endpoints swap the production model or profile it
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+def require_single_worker():
+    # A slot change would reach only the worker the kernel hands this request to
+    if config.WORKERS > 1:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Model slots are per worker process and {config.WORKERS} workers are running; "
+                   "restart the workers to serve a new artifact")
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+# How often POST /admin/reload checks whether its load has finished
+RELOAD_POLL_SECONDS = 0.1
+
+def _artifact_path(path: Optional[str]) -> Optional[str]:
+    # Only artifacts inside the data directory can be loaded
+    if path is None:
+        return None
+    data_dir = os.path.realpath(config.DATA_DIR)
+    resolved = os.path.realpath(os.path.join(data_dir, path))
+    if os.path.commonpath([data_dir, resolved]) != data_dir:
+        raise HTTPException(status_code=400, detail="artifact_path must be inside the data directory")
+    return resolved
+
+@router.get("/models")
+def model_slots(ml_service: MLService = Depends(get_ml_service)):
+    return ml_service.slots()
+
+@router.post("/models/load", status_code=202, dependencies=[Depends(require_single_worker)])
+def load_model(request: ModelLoadRequest, ml_service: MLService = Depends(get_ml_service)):
+    # Returns at once; poll GET /admin/models/load. The current models serve until the swap
+    try:
+        return ml_service.start_load(_artifact_path(request.artifact_path), request.slot,
+                                     request.traffic_percent)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/reload", dependencies=[Depends(require_single_worker)])
+async def reload_model(ml_service: MLService = Depends(get_ml_service)):
+    # Picks up an artifact written by ingest.py: a smoke-tested load of the serving artifact
+    # into the primary slot, answered once it is installed or has failed
+    try:
+        job = ml_service.start_load()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    while job['status'] == 'running':
+        await asyncio.sleep(RELOAD_POLL_SECONDS)
+        job = ml_service.load_status()
+    if job['status'] == 'failed':
+        raise HTTPException(status_code=500, detail=job['error'])
+    return {"model_version": job['model_version'], "smoke_test": job['smoke_test']}
+
+@router.get("/models/load")
+def load_status(ml_service: MLService = Depends(get_ml_service)):
+    status = ml_service.load_status()
+    if status is None:
+        raise HTTPException(status_code=404, detail="No model load has been started")
+    return status
+
+@router.put("/models/canary/traffic", dependencies=[Depends(require_single_worker)])
+def set_canary_traffic(percent: float = Query(..., ge=0, le=100),
+                       ml_service: MLService = Depends(get_ml_service)):
+    try:
+        ml_service.set_canary_traffic(percent)
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return ml_service.slots()
+
+@router.post("/models/canary/promote", dependencies=[Depends(require_single_worker)])
+def promote_canary(ml_service: MLService = Depends(get_ml_service)):
+    try:
+        ml_service.promote_canary()
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return ml_service.slots()
+
+@router.delete("/models/canary", dependencies=[Depends(require_single_worker)])
+def drop_canary(ml_service: MLService = Depends(get_ml_service)):
+    try:
+        ml_service.drop_canary()
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return ml_service.slots()
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from app import dependencies
+from app.routers.admin import require_admin
+from app.services.metrics import REGISTRY
+from app.services.profiler import PROFILER
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@router.get("/ready")
+def ready():
+    # Readiness probe: 503 until the model is loaded and warm-up has finished
+    warmup = dependencies.warmup
+    if warmup is None:
+        return ORJSONResponse({'ready': False, 'warmup': 'not started'}, status_code=503)
+    return ORJSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+# Profiles expose code paths and slow every sampled request, so they need the admin token
+@router.post("/debug/profile", dependencies=[Depends(require_admin)])
+def start_profile(requests: int = Query(100, ge=1, le=100000),
+                  interval_ms: float = Query(5.0, gt=0, le=1000)):
+    try:
+        PROFILER.arm(requests, interval_ms)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PROFILER.status()
+
+@router.get("/debug/profile/status", dependencies=[Depends(require_admin)])
+def profile_status():
+    return PROFILER.status()
+
+@router.get("/debug/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+def get_profile():
+    # Collapsed stacks: feed to flamegraph.pl, speedscope or inferno-flamegraph
+    if PROFILER.last_profile is None:
+        raise HTTPException(status_code=404, detail="No profile captured yet")
+    return PlainTextResponse(PROFILER.last_profile)
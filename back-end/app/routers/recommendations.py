@@ -1,35 +1,49 @@
-from fastapi import APIRouter
-import pandas as pd
-from pathlib import Path
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import Optional
+from app.dependencies import get_ml_service, run_scoring
+from app.models.schemas import StudentInput, RecommendationResponse
+from app.services.metadata_service import MetadataPayload
+from app.services.ml_service import MLService
+from app import config
 
 router = APIRouter()
 
-DATASET_PATH = Path(__file__).parent.parent / "data" / "dataset.csv"
+def cached_json(request: Request, payload: MetadataPayload) -> Response:
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": f"public, max-age={config.METADATA_MAX_AGE_SECONDS}"
+    }
+    if payload.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
 
 @router.get("/health")
 def health_check():
     return {"status": "healthy", "message": "Degree Recommendation API is running"}
 
 @router.get("/districts")
-def get_districts():
-    df = pd.read_csv(DATASET_PATH)
-    districts = df["District"].unique().tolist()
-    return districts
+def get_districts(request: Request, ml_service: MLService = Depends(get_ml_service)):
+    return cached_json(request, ml_service.metadata.districts)
 
 @router.get("/streams")
-def get_streams():
-    df = pd.read_csv(DATASET_PATH)
-    streams = df["Stream"].unique().tolist()
-    return streams
-
-@router.post("/recommendations")
-def get_recommendations(request: dict):
-    from app.services.ml_service import MLService
-    ml_service = MLService()
-    recommendations = ml_service.get_recommendations(
-        zscore=request.get("zscore"),
-        district=request.get("district"),
-        stream=request.get("stream"),
-        exam_year=request.get("exam_year")
-    )
-    return {"recommendations": recommendations}
\ No newline at end of file
+def get_streams(request: Request, ml_service: MLService = Depends(get_ml_service)):
+    return cached_json(request, ml_service.metadata.streams)
+
+@router.get("/courses")
+def get_courses(request: Request, ml_service: MLService = Depends(get_ml_service)):
+    return cached_json(request, ml_service.metadata.courses)
+
+@router.get("/universities")
+def get_universities(request: Request, ml_service: MLService = Depends(get_ml_service)):
+    return cached_json(request, ml_service.metadata.universities)
+
+@router.get("/courses/stats")
+def get_course_stats(request: Request, ml_service: MLService = Depends(get_ml_service)):
+    return cached_json(request, ml_service.metadata.course_stats)
+
+@router.post("/recommendations", response_model=RecommendationResponse)
+async def get_recommendations(input_data: StudentInput,
+                              top_k: Optional[int] = Query(None, ge=1),
+                              min_score: Optional[float] = None,
+                              ml_service: MLService = Depends(get_ml_service)):
+    return await run_scoring(ml_service.recommend_courses, input_data, top_k, min_score)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+from app.models.features import (
+    FEATURES, FEATURE_INDEX, CROSS_STREAM,
+    matched_course_university, district_competition, stream_course_compatibility
+)
+from app.services.metrics import LABEL_ENCODING_FALLBACKS, timed
+
+class CandidateSet:
+    """Static feature rows for every (Course, University) pair offered to one stream.
+
+    Only the student dependent columns (district, stream, z-score) are left to
+    be filled in per request by ``build_features``.
+    """
+
+    def __init__(self, courses, universities, features, course_avg_zscore,
+                 course_demand, district_competition):
+        self.courses = courses
+        self.universities = universities
+        self.features = features
+        self.course_avg_zscore = course_avg_zscore
+        self.course_demand = course_demand
+        # District name -> district_competition column for these candidates
+        self.district_competition = district_competition
+
+    def __len__(self):
+        return len(self.courses)
+
+
+class CandidateIndex:
+    def __init__(self, model):
+        self.model = model
+
+        # Static values shared by every candidate set
+        self.exam_year = model.latest_exam_year
+        self.exam_year_encoded = self.encode('Exam_Year', self.exam_year)
+        self.not_nqc_encoded = self.encode('is_NQC', False)
+        self.nqc_encoded = self.encode('is_NQC', True)
+
+        intake = model.course_table['Intake'] / model.intake_max
+        districts = model.district_course_count.index.get_level_values('District').unique().to_numpy()
+
+        self.candidates = {}
+        for stream, pairs in model.stream_candidates.items():
+            courses = pairs['Course'].to_numpy()
+            universities = pairs['University'].to_numpy()
+            matched = pd.Index(matched_course_university(pairs['Course'], pairs['University']))
+
+            course_avg_zscore = model.course_avg_zscore.reindex(matched).fillna(0).to_numpy()
+            course_demand = model.course_demand.reindex(matched).fillna(0).to_numpy()
+
+            features = np.zeros((len(pairs), len(FEATURES)), dtype=np.float64)
+            features[:, FEATURE_INDEX['Exam_Year_encoded']] = self.exam_year_encoded
+            features[:, FEATURE_INDEX['Course_encoded']] = model.label_encoders['Course'].transform(courses)
+            features[:, FEATURE_INDEX['University_encoded']] = model.label_encoders['University'].transform(universities)
+            features[:, FEATURE_INDEX['zscore_percentile']] = (len(pairs) + 1) / (2 * len(pairs))
+            # Serving scores every candidate against all streams, as for Cross Stream rows
+            features[:, FEATURE_INDEX['stream_course_compatibility']] = stream_course_compatibility(
+                np.full(len(matched), CROSS_STREAM), matched, model.stream_course_count)
+            features[:, FEATURE_INDEX['course_popularity']] = (
+                model.course_popularity.reindex(matched).fillna(0).to_numpy())
+            features[:, FEATURE_INDEX['intake_normalized']] = intake.reindex(matched).fillna(0).to_numpy()
+            features[:, FEATURE_INDEX['course_demand']] = course_demand
+
+            # One lookup for every (district, candidate) pair, split into a row per district
+            competition = district_competition(
+                np.repeat(districts, len(matched)), np.tile(matched, len(districts)),
+                model.district_course_count).reshape(len(districts), len(matched))
+            competition = dict(zip(districts, competition))
+
+            self.candidates[stream] = CandidateSet(
+                courses, universities, features, course_avg_zscore,
+                course_demand, competition)
+
+    def encode(self, col, value):
+        encoder = self.model.label_encoders[col]
+        code = encoder.encode(value)
+        if code == encoder.unknown_code:
+            LABEL_ENCODING_FALLBACKS.inc(column=col)
+        return code
+
+    def get(self, stream):
+        return self.candidates.get(stream)
+
+    def build_features(self, candidates, district, stream, zscore, rows=None):
+        """Feature matrix for the candidates, or only for the positions in ``rows``.
+
+        zscore_percentile keeps the value of the full candidate set either way.
+        """
+        with timed('label_encoding'):
+            district_encoded = self.encode('District', district)
+            stream_encoded = self.encode('Stream', stream)
+        if rows is None:
+            rows = slice(None)
+            features = candidates.features.copy()
+        else:
+            features = candidates.features[rows]
+        features[:, FEATURE_INDEX['District_encoded']] = district_encoded
+        features[:, FEATURE_INDEX['Stream_encoded']] = stream_encoded
+        features[:, FEATURE_INDEX['Zscore_Values']] = zscore
+        features[:, FEATURE_INDEX['zscore_vs_course_avg']] = zscore - candidates.course_avg_zscore[rows]
+        competition = candidates.district_competition.get(district)
+        if competition is not None:
+            features[:, FEATURE_INDEX['district_competition']] = competition[rows]
+        features[:, FEATURE_INDEX['is_NQC_encoded']] = self.nqc_encoded if zscore == -10 else self.not_nqc_encoded
+        return features
@@ -0,0 +1,44 @@
+import hashlib
+import json
+import pandas as pd
+
+
+class MetadataPayload:
+    """Pre-serialized JSON body with a content-derived ETag."""
+
+    def __init__(self, data):
+        self.data = data
+        self.body = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+
+
+class MetadataService:
+    """Lookup lists and per-course statistics served from memory.
+
+    Built once from the loaded PredictionModel's serving tables so the
+    metadata endpoints never touch the CSV.
+    """
+
+    def __init__(self, model):
+        candidates = pd.concat(model.stream_candidates.values())
+        self.districts = MetadataPayload(list(model.districts))
+        self.streams = MetadataPayload(list(model.streams))
+        self.courses = MetadataPayload(sorted(candidates['Course'].unique().tolist()))
+        self.universities = MetadataPayload(sorted(candidates['University'].unique().tolist()))
+
+        courses = model.course_table.sort_index()
+        self.course_stats = MetadataPayload([
+            {
+                'course': str(course),
+                'university': str(university),
+                'avg_zscore': _float_or_none(model.course_avg_zscore.get(key)),
+                'demand_score': _float_or_none(model.course_demand.get(key)),
+                'popularity': int(model.course_popularity.get(key, 0)),
+                'intake': float(intake)
+            }
+            for key, course, university, intake in zip(
+                courses.index, courses['Course'], courses['University'], courses['Intake'])
+        ])
+
+def _float_or_none(value):
+    return None if value is None else float(value)
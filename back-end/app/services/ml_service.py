@@ -1,189 +1,470 @@
 from app.models.prediction_model import PredictionModel
-from app.models.schemas import StudentInput, RecommendationResponse, CourseRecommendation
-import pandas as pd
+from app.models.artifact import ArtifactError, check_sources
+from app.models.tree_engine import InferenceEngine
+from app.models.schemas import (
+    StudentInput, RecommendationResponse, CombinedRecommendationResponse, WhatIfInput, WhatIfResponse
+)
+from app.models.features import CROSS_STREAM
+from app.services.candidate_index import CandidateIndex
+from app.services.metadata_service import MetadataService
+from app.services.metrics import MODEL_SLOT_SECONDS, timed
+from app.services.ranking import RankedCandidates
+from app.services.recommendation_cache import RecommendationCache
+from app.services.whatif import WhatIfTable, model_fingerprint
+from app import config
+from typing import List, Optional, Tuple
+import numpy as np
 import os
+import threading
+import time
+import zlib
+
+# Requests scored per predict call, and per scoring task when streaming a batch
+BATCH_CHUNK_SIZE = 256
+
+PRIMARY = 'primary'
+CANARY = 'canary'
+SLOTS = (PRIMARY, CANARY)
+
+# Probe grid scored by the smoke test before a loaded model takes traffic
+SMOKE_DISTRICTS = 3
+SMOKE_ZSCORES = (-1.0, 0.0, 1.0, 2.0)
+
+NO_CANDIDATES = RankedCandidates(np.array([], dtype=object), np.array([], dtype=object),
+                                 np.array([], dtype=np.float64), np.array([], dtype=np.float64))
+
+def load_prediction_model(data_path: str, model_path: str, artifact_path: str,
+                          low_memory: bool = False) -> PredictionModel:
+    """Load the serving model from its artifact, building the artifact first if needed.
+
+    Without an artifact, or with one not built from the current dataset and
+    model file, the CSV is loaded (training if no model file exists) and the
+    artifact is rewritten, so later processes can attach to it. With
+    ``low_memory`` the freshly built model is then swapped for the
+    memory-mapped artifact, so the preprocessed frame is not kept.
+    """
+    model = PredictionModel()
+    try:
+        check_sources(model.load_artifact(artifact_path), data_path, model_path)
+    except (FileNotFoundError, ArtifactError):
+        if not os.path.exists(model_path):
+            model.load_data(data_path)
+            model.train_model(model_path)
+        else:
+            # Encode with the classes the booster was trained on, not ones refitted to the CSV
+            model.load_model(model_path)
+            model.load_data(data_path, encoders=model.label_encoders)
+        model.save_artifact(artifact_path)
+        if low_memory:
+            model = PredictionModel()
+            model.load_artifact(artifact_path)
+    return model
+
+class ServingState:
+    """Everything one loaded model serves with, swapped in as a single reference on reload."""
+
+    def __init__(self, version, model, candidate_index, metadata, engine, whatif=None, artifact=None):
+        self.version = version
+        self.model = model
+        self.candidate_index = candidate_index
+        self.metadata = metadata
+        self.engine = engine
+        # WhatIfTable built for this model, if one exists
+        self.whatif = whatif
+        self.artifact = artifact
+        self.loaded_at = time.time()
+        # Requests served and their scoring + serialization time, for the admin slot report
+        self.requests = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self.requests += 1
+            self.seconds += seconds
+
+    def summary(self):
+        with self._lock:
+            requests, seconds = self.requests, self.seconds
+        return {
+            'model_version': self.version,
+            'artifact': self.artifact,
+            'loaded_at': self.loaded_at,
+            'requests': requests,
+            'mean_latency_ms': 1000 * seconds / requests if requests else None
+        }
 
 class MLService:
-    def __init__(self, data_path: str, model_path: str):
-        self.model = PredictionModel()
+    def __init__(self, data_path: str, model_path: str, artifact_path: Optional[str] = None,
+                 whatif_path: Optional[str] = None):
         self.data_path = data_path
         self.model_path = model_path
-        
-        if not os.path.exists(model_path):
-            self.model.load_data(data_path)
-            self.model.train_model(model_path)
-        else:
-            self.model.load_data(data_path)
-            self.model.load_model(model_path)
-
-    def recommend_courses(self, input_data: StudentInput) -> RecommendationResponse:
-        df = self.model.df
-        course_university_pairs = df[
-            (df['Stream'] == input_data.stream)
-        ][['Course', 'University']].drop_duplicates().values.tolist()
-        
-        if not course_university_pairs:
-            return RecommendationResponse(recommendations=[])
-        
-        new_student = pd.DataFrame({
-            'Exam_Year': [df['Exam_Year'].max()] * len(course_university_pairs),
-            'District': [input_data.district] * len(course_university_pairs),
-            'Stream': [input_data.stream] * len(course_university_pairs),
-            'Zscore_Values': [input_data.zscore] * len(course_university_pairs),
-            'Course': [pair[0] for pair in course_university_pairs],
-            'University': [pair[1] for pair in course_university_pairs]
-        })
-        new_student['Matched_Course_University'] = new_student['Course'] + ' (' + new_student['University'] + ')'
-
-        # Apply preprocessing
-        new_student['zscore_percentile'] = new_student['Zscore_Values'].rank(pct=True)
-        new_student['zscore_vs_course_avg'] = new_student['Zscore_Values'] - new_student[
-            'Matched_Course_University'].map(self.model.course_avg_zscore).fillna(0)
-        new_student['district_competition'] = new_student.apply(
-            lambda x: self.model.district_course_count.get(
-                (x['District'], x['Matched_Course_University']), 0), axis=1)
-        
-        def calculate_stream_compatibility(row):
-            course = row['Matched_Course_University']
-            return sum(self.model.stream_course_count.get((s, course), 0) 
-                      for s in ['Arts', 'Commerce', 'Biological Science', 
-                                'Physical Science', 'Engineering Technology', 
-                                'Biosystems Technology', 'Cross Stream'])
-        
-        new_student['stream_course_compatibility'] = new_student.apply(calculate_stream_compatibility, axis=1)
-        
-        new_student['course_popularity'] = new_student['Matched_Course_University'].map(
-            self.model.course_popularity).fillna(0)
-        new_student['intake_normalized'] = new_student['Matched_Course_University'].map(
-            df.groupby('Matched_Course_University')['Intake'].first() / df['Intake'].max()
-        ).fillna(0)
-        new_student['is_NQC'] = new_student['Zscore_Values'] == -10
-        new_student['course_demand'] = new_student['Matched_Course_University'].map(
-            self.model.course_demand).fillna(0)
-
-        categorical_cols = ['Exam_Year', 'District', 'Stream', 'Course', 'University', 'is_NQC']
-        for col in categorical_cols:
-            col_encoded = col + '_encoded'
-            try:
-                new_student[col_encoded] = self.model.label_encoders[col].transform(
-                    new_student[col].fillna('Missing').astype(str))
-            except ValueError:
-                new_student[col_encoded] = new_student[col].map(
-                    lambda x: self.model.label_encoders[col].transform([x])[0] 
-                    if x in self.model.label_encoders[col].classes_ 
-                    else self.model.label_encoders[col].transform(['Missing'])[0]
-                )
-
-        new_student['group_id'] = new_student['District'] + '_' + new_student['Stream'] + '_' + new_student['Exam_Year']
-
-        features = [
-            'Exam_Year_encoded', 'District_encoded', 'Stream_encoded', 'Course_encoded', 
-            'University_encoded', 'Zscore_Values', 'zscore_percentile', 
-            'zscore_vs_course_avg', 'district_competition', 'stream_course_compatibility', 
-            'course_popularity', 'intake_normalized', 'is_NQC_encoded', 'course_demand'
-        ]
+        self.artifact_path = artifact_path or os.path.join(os.path.dirname(model_path), 'artifact')
+        self.whatif_path = whatif_path
+        self.state = None
+        # (canary ServingState or None, percent of recommendation traffic it receives)
+        self._canary = (None, 0.0)
+        self._versions = 0
+        self._swap_lock = threading.Lock()
+        # Latest background load started with start_load()
+        self._load_job = None
+        self._load_lock = threading.Lock()
+        # (model version, evaluate() result)
+        self._evaluation = None
+        self._evaluation_lock = threading.Lock()
+        self.cache = RecommendationCache(
+            max_entries=config.CACHE_MAX_ENTRIES,
+            ttl_seconds=config.CACHE_TTL_SECONDS,
+            zscore_quantum=config.CACHE_ZSCORE_QUANTUM
+        )
+        self.reload()
 
-        predictions = self.model.model.predict(new_student[features])
-        new_student['Predicted_Score'] = predictions
-        ranked_courses = new_student.sort_values(by='Predicted_Score', ascending=False)
-
-        viable_courses = ranked_courses[
-            (ranked_courses['zscore_vs_course_avg'] >= -0.5) & (~ranked_courses['is_NQC'])
-        ][['Course', 'University', 'Predicted_Score', 'course_demand']]
-
-        recommendations = [
-            CourseRecommendation(
-                course=row['Course'],
-                university=row['University'],
-                predicted_score=row['Predicted_Score'],
-                demand_score=row['course_demand']
-            ) for _, row in viable_courses.iterrows()
-        ]
+    @property
+    def model_version(self):
+        return self.state.version
+
+    @property
+    def model(self):
+        return self.state.model
+
+    @property
+    def candidate_index(self):
+        return self.state.candidate_index
+
+    @property
+    def metadata(self):
+        return self.state.metadata
+
+    @property
+    def engine(self):
+        return self.state.engine
+
+    @property
+    def canary(self):
+        return self._canary[0]
+
+    def reload(self):
+        """Load the primary model at startup, building the artifact first if needed.
+
+        Running services switch models with ``start_load`` instead, which
+        never touches the CSV and smoke tests the model before installing it.
+        """
+        model = load_prediction_model(self.data_path, self.model_path, self.artifact_path,
+                                      low_memory=config.LOW_MEMORY_SERVING)
+        state = self._build_state(model, self.artifact_path)
+        self._install(state, PRIMARY)
+        return state.version
+
+    def _build_state(self, model, artifact_path):
+        candidate_index = CandidateIndex(model)
+        metadata = MetadataService(model)
+        engine = InferenceEngine(
+            getattr(model.model, 'booster_', model.model),
+            compiled=config.COMPILED_INFERENCE,
+            max_compiled_cells=config.COMPILED_INFERENCE_MAX_CELLS,
+            num_threads=config.PREDICT_THREADS
+        )
+        whatif = self._load_whatif(model)
+        with self._swap_lock:
+            self._versions += 1
+            version = self._versions
+        return ServingState(version, model, candidate_index, metadata, engine, whatif,
+                            artifact=os.path.realpath(artifact_path))
+
+    def _install(self, state, slot, traffic_percent=None):
+        """Serve ``state`` from ``slot``; each slot switches over in one assignment."""
+        with self._swap_lock:
+            if slot == PRIMARY:
+                self.state = state
+            else:
+                percent = self._canary[1] if traffic_percent is None else traffic_percent
+                self._canary = (state, percent)
+            # Cache keys carry the model version; drop what no resident model can hit
+            self.cache.retain_versions({self.state.version, getattr(self.canary, 'version', None)})
+
+    def start_load(self, artifact_path: Optional[str] = None, slot: str = PRIMARY,
+                   traffic_percent: Optional[float] = None):
+        """Load an artifact into ``slot`` on a background thread; returns the job record.
+
+        The new model is smoke tested before it is installed, so a broken
+        artifact never takes traffic. Raises RuntimeError while another load
+        is running.
+        """
+        if slot not in SLOTS:
+            raise ValueError(f"Unknown model slot: {slot}")
+        with self._load_lock:
+            if self._load_job is not None and self._load_job['status'] == 'running':
+                raise RuntimeError("A model load is already running")
+            self._load_job = {
+                'status': 'running',
+                'slot': slot,
+                'artifact_path': artifact_path or self.artifact_path,
+                'traffic_percent': traffic_percent,
+                'started_at': time.time(),
+                'finished_at': None,
+                'model_version': None,
+                'smoke_test': None,
+                'error': None
+            }
+            job = self._load_job
+        threading.Thread(target=self._run_load, args=(job,), name='model-loader', daemon=True).start()
+        return dict(job)
 
-        return RecommendationResponse(recommendations=recommendations)
-
-    def recommend_cross_stream_courses(self, input_data: StudentInput) -> RecommendationResponse:
-        df = self.model.df
-        course_university_pairs = df[
-            df['Stream'] == 'Cross Stream'
-        ][['Course', 'University']].drop_duplicates().values.tolist()
-        
-        if not course_university_pairs:
-            return RecommendationResponse(recommendations=[])
-        
-        new_student = pd.DataFrame({
-            'Exam_Year': [df['Exam_Year'].max()] * len(course_university_pairs),
-            'District': [input_data.district] * len(course_university_pairs),
-            'Stream': [input_data.stream] * len(course_university_pairs),
-            'Zscore_Values': [input_data.zscore] * len(course_university_pairs),
-            'Course': [pair[0] for pair in course_university_pairs],
-            'University': [pair[1] for pair in course_university_pairs]
-        })
-        new_student['Matched_Course_University'] = new_student['Course'] + ' (' + new_student['University'] + ')'
-
-        # Apply preprocessing
-        new_student['zscore_percentile'] = new_student['Zscore_Values'].rank(pct=True)
-        new_student['zscore_vs_course_avg'] = new_student['Zscore_Values'] - new_student[
-            'Matched_Course_University'].map(self.model.course_avg_zscore).fillna(0)
-        new_student['district_competition'] = new_student.apply(
-            lambda x: self.model.district_course_count.get(
-                (x['District'], x['Matched_Course_University']), 0), axis=1)
-        
-        def calculate_stream_compatibility(row):
-            course = row['Matched_Course_University']
-            return sum(self.model.stream_course_count.get((s, course), 0) 
-                      for s in ['Arts', 'Commerce', 'Biological Science', 
-                                'Physical Science', 'Engineering Technology', 
-                                'Biosystems Technology', 'Cross Stream'])
-        
-        new_student['stream_course_compatibility'] = new_student.apply(calculate_stream_compatibility, axis=1)
-        
-        new_student['course_popularity'] = new_student['Matched_Course_University'].map(
-            self.model.course_popularity).fillna(0)
-        new_student['intake_normalized'] = new_student['Matched_Course_University'].map(
-            df.groupby('Matched_Course_University')['Intake'].first() / df['Intake'].max()
-        ).fillna(0)
-        new_student['is_NQC'] = new_student['Zscore_Values'] == -10
-        new_student['course_demand'] = new_student['Matched_Course_University'].map(
-            self.model.course_demand).fillna(0)
-
-        categorical_cols = ['Exam_Year', 'District', 'Stream', 'Course', 'University', 'is_NQC']
-        for col in categorical_cols:
-            col_encoded = col + '_encoded'
-            try:
-                new_student[col_encoded] = self.model.label_encoders[col].transform(
-                    new_student[col].fillna('Missing').astype(str))
-            except ValueError:
-                new_student[col_encoded] = new_student[col].map(
-                    lambda x: self.model.label_encoders[col].transform([x])[0] 
-                    if x in self.model.label_encoders[col].classes_ 
-                    else self.model.label_encoders[col].transform(['Missing'])[0]
-                )
-
-        new_student['group_id'] = new_student['District'] + '_' + new_student['Stream'] + '_' + new_student['Exam_Year']
-
-        features = [
-            'Exam_Year_encoded', 'District_encoded', 'Stream_encoded', 'Course_encoded', 
-            'University_encoded', 'Zscore_Values', 'zscore_percentile', 
-            'zscore_vs_course_avg', 'district_competition', 'stream_course_compatibility', 
-            'course_popularity', 'intake_normalized', 'is_NQC_encoded', 'course_demand'
+    def load_status(self):
+        with self._load_lock:
+            return dict(self._load_job) if self._load_job is not None else None
+
+    def _run_load(self, job):
+        try:
+            model = PredictionModel()
+            model.load_artifact(job['artifact_path'])
+            state = self._build_state(model, job['artifact_path'])
+            smoke_test = self._smoke_test(state)
+            self._install(state, job['slot'], job['traffic_percent'])
+            result = {'status': 'succeeded', 'model_version': state.version, 'smoke_test': smoke_test}
+        except Exception as e:
+            result = {'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+        with self._load_lock:
+            job.update(result, finished_at=time.time())
+
+    def _smoke_test(self, state):
+        """Score a probe grid with ``state``; raises ValueError if the model looks broken.
+
+        With RELOAD_MIN_NDCG set, the held-out NDCG@5 must also reach it.
+        """
+        start = time.perf_counter()
+        model = state.model
+        probes = [
+            (StudentInput(district=district, stream=stream, zscore=zscore), cross_stream)
+            for district in model.districts[:SMOKE_DISTRICTS] for stream in model.streams
+            for zscore in SMOKE_ZSCORES for cross_stream in (False, True)
         ]
+        rankings = self._score_batch(state, probes)
+        scores = np.concatenate([ranking.scores for ranking in rankings])
+        if len(scores) == 0:
+            raise ValueError("Smoke test ranked no courses for any probe")
+        if not np.isfinite(scores).all():
+            raise ValueError("Smoke test produced non-finite scores")
+        result = {'probes': len(probes), 'courses_ranked': len(scores)}
+        if config.RELOAD_MIN_NDCG > 0:
+            ndcg = self._evaluate_model(model)['NDCG@5']
+            result['NDCG@5'] = ndcg
+            if ndcg < config.RELOAD_MIN_NDCG:
+                raise ValueError(f"Held-out NDCG@5 {ndcg:.4f} is below RELOAD_MIN_NDCG {config.RELOAD_MIN_NDCG}")
+        result['seconds'] = time.perf_counter() - start
+        return result
+
+    def set_canary_traffic(self, percent: float):
+        """Route ``percent`` of recommendation traffic to the canary; raises LookupError without one."""
+        with self._swap_lock:
+            if self.canary is None:
+                raise LookupError("No canary model is loaded")
+            self._canary = (self.canary, percent)
+
+    def promote_canary(self):
+        """Make the canary the primary model, serving all traffic; returns its version."""
+        with self._swap_lock:
+            canary = self.canary
+            if canary is None:
+                raise LookupError("No canary model is loaded")
+            self.state = canary
+            self._canary = (None, 0.0)
+            self.cache.retain_versions({canary.version})
+        return canary.version
+
+    def drop_canary(self):
+        with self._swap_lock:
+            if self.canary is None:
+                raise LookupError("No canary model is loaded")
+            self._canary = (None, 0.0)
+            self.cache.retain_versions({self.state.version})
+
+    def slots(self):
+        canary, percent = self._canary
+        return {
+            PRIMARY: self.state.summary(),
+            CANARY: canary.summary() if canary is not None else None,
+            'canary_traffic_percent': percent if canary is not None else 0.0
+        }
+
+    def _route(self, input_data: StudentInput):
+        """(slot, state) serving ``input_data``.
+
+        The split hashes the same fields as the cache key, so a given student
+        always lands on the same model and each slot's cache stays warm.
+        """
+        canary, percent = self._canary
+        if canary is None or percent <= 0:
+            return PRIMARY, self.state
+        key = f'{input_data.district}\x00{input_data.stream}\x00{self.cache.quantize(input_data.zscore)}'
+        if zlib.crc32(key.encode()) % 10000 < percent * 100:
+            return CANARY, canary
+        return PRIMARY, self.state
+
+    def _load_whatif(self, model):
+        if not self.whatif_path or not os.path.exists(self.whatif_path):
+            return None
+        whatif = WhatIfTable(self.whatif_path)
+        # A table built with another booster or encoders would answer for the wrong model
+        if whatif.model_fingerprint != model_fingerprint(model):
+            return None
+        return whatif
+
+    def whatif(self, input_data: WhatIfInput) -> Optional[WhatIfResponse]:
+        """Compare precomputed rankings at two z-scores; None for an unknown district/stream.
+
+        Raises LookupError when no what-if table matches the serving model.
+        """
+        whatif = self.state.whatif
+        if whatif is None:
+            raise LookupError("No what-if table for the current model; run whatif.py")
+        result = whatif.compare(input_data.district, input_data.stream, input_data.cross_stream,
+                                input_data.from_zscore, input_data.to_zscore)
+        return WhatIfResponse(**result) if result is not None else None
+
+    def evaluate(self):
+        """Evaluate the serving booster on the held-out split, once per model version.
+
+        The split is rebuilt from the CSV when the model came from an artifact.
+        ``held_out`` is false when the booster was also fit on those rows.
+        """
+        state = self.state
+        with self._evaluation_lock:
+            if self._evaluation is not None and self._evaluation[0] == state.version:
+                return self._evaluation[1]
+            results = {**self._evaluate_model(state.model), 'model_version': state.version}
+            self._evaluation = (state.version, results)
+            return results
+
+    def _evaluate_model(self, model):
+        if model.df is None:
+            evaluation = PredictionModel()
+            # The serving model's codes, which classes ingested since the last rebuild shift
+            evaluation.load_data(self.data_path, encoders=model.label_encoders)
+            evaluation.model = model.model
+            evaluation.evaluation_held_out = model.evaluation_held_out
+            model = evaluation
+        return model.evaluate_model()
+
+    def recommend_courses(self, input_data: StudentInput, top_k: Optional[int] = None,
+                          min_score: Optional[float] = None) -> RecommendationResponse:
+        return self.recommend_courses_batch([input_data], top_k=top_k, min_score=min_score)[0]
+
+    def recommend_cross_stream_courses(self, input_data: StudentInput, top_k: Optional[int] = None,
+                                       min_score: Optional[float] = None) -> RecommendationResponse:
+        return self.recommend_courses_batch(
+            [input_data], cross_stream=True, top_k=top_k, min_score=min_score)[0]
+
+    def recommend_courses_batch(self, inputs: List[StudentInput], cross_stream: bool = False,
+                                top_k: Optional[int] = None,
+                                min_score: Optional[float] = None) -> List[RecommendationResponse]:
+        """Rank courses for many students, scoring the cache misses BATCH_CHUNK_SIZE at a time.
+
+        ``top_k`` keeps the best courses only; ``min_score`` drops courses
+        predicted below it. A batch is served by the slot its first student
+        routes to.
+        """
+        if not inputs:
+            return []
+        start = time.perf_counter()
+        slot, state = self._route(inputs[0])
+        rankings = self._rank_many(state, [(input_data, cross_stream) for input_data in inputs])
+        # to_response times its ranking and serialization stages separately
+        responses = [ranking.to_response(top_k, min_score) for ranking in rankings]
+        self._observe(slot, state, start)
+        return responses
+
+    def recommend_all(self, input_data: StudentInput, top_k: Optional[int] = None,
+                      offset: int = 0, min_score: Optional[float] = None) -> CombinedRecommendationResponse:
+        """Rank in-stream and Cross Stream courses together with one predict call.
+
+        ``offset``/``top_k`` select a page of each ranked list; the totals count
+        every course scoring at least ``min_score``.
+        """
+        start = time.perf_counter()
+        slot, state = self._route(input_data)
+        in_stream, cross_stream = self._rank_many(state, [(input_data, False), (input_data, True)])
+        response = CombinedRecommendationResponse.model_construct(
+            recommendations=in_stream.to_response(top_k, min_score, offset).recommendations,
+            cross_stream_recommendations=cross_stream.to_response(top_k, min_score, offset).recommendations,
+            total=in_stream.count(min_score),
+            cross_stream_total=cross_stream.count(min_score)
+        )
+        self._observe(slot, state, start)
+        return response
+
+    def _observe(self, slot, state, start):
+        seconds = time.perf_counter() - start
+        MODEL_SLOT_SECONDS.observe(seconds, slot=slot)
+        state.observe(seconds)
+
+    def _rank_many(self, state: ServingState,
+                   requests: List[Tuple[StudentInput, bool]]) -> List[RankedCandidates]:
+        """Serve (input, cross_stream) requests from the cache, scoring misses in chunks.
+
+        ``state`` is snapshotted once by the caller, so a concurrent reload
+        never mixes two models within a request.
+        """
+        with timed('cache_lookup'):
+            keys = [
+                self.cache.key(state.version, cross_stream, input_data.district,
+                               input_data.stream, input_data.zscore)
+                for input_data, cross_stream in requests
+            ]
+            results = [self.cache.get(key) for key in keys]
+            misses = [i for i, result in enumerate(results) if result is None]
+        if not misses:
+            return results
+
+        # Chunked so a large batch never builds one feature matrix for every student
+        for start in range(0, len(misses), BATCH_CHUNK_SIZE):
+            chunk = misses[start:start + BATCH_CHUNK_SIZE]
+            # Score the quantized z-score so every input sharing a key gets the same answer
+            computed = self._score_batch(state, [
+                (requests[i][0].model_copy(update={'zscore': keys[i][-1]}), requests[i][1]) for i in chunk
+            ])
+            for i, ranking in zip(chunk, computed):
+                self.cache.put(keys[i], ranking)
+                results[i] = ranking
+        return results
+
+    def _score_batch(self, state: ServingState,
+                     requests: List[Tuple[StudentInput, bool]]) -> List[RankedCandidates]:
+        with timed('candidate_filtering'):
+            jobs = [(self._viable_rows(state, input_data, cross_stream), input_data)
+                    for input_data, cross_stream in requests]
+            scored = [(viable, input_data) for viable, input_data in jobs if viable is not None]
+        if not scored:
+            return [NO_CANDIDATES for _ in jobs]
+
+        with timed('feature_building'):
+            features = [
+                state.candidate_index.build_features(
+                    candidates, input_data.district, input_data.stream, input_data.zscore, rows)
+                for (candidates, rows), input_data in scored
+            ]
+            features = np.vstack(features) if len(features) > 1 else features[0]
+            sizes = [len(rows) for (_, rows), _ in scored]
+        with timed('predict'):
+            predictions = state.engine.predict(features)
+        predictions = iter(np.split(predictions, np.cumsum(sizes)[:-1]))
 
-        predictions = self.model.model.predict(new_student[features])
-        new_student['Predicted_Score'] = predictions
-        ranked_courses = new_student.sort_values(by='Predicted_Score', ascending=False)
-
-        viable_courses = ranked_courses[
-            (ranked_courses['zscore_vs_course_avg'] >= -0.5) & (~ranked_courses['is_NQC'])
-        ][['Course', 'University', 'Predicted_Score', 'course_demand']]
-
-        recommendations = [
-            CourseRecommendation(
-                course=row['Course'],
-                university=row['University'],
-                predicted_score=row['Predicted_Score'],
-                demand_score=row['course_demand']
-            ) for _, row in viable_courses.iterrows()
+        return [
+            RankedCandidates(
+                viable[0].courses[viable[1]], viable[0].universities[viable[1]],
+                next(predictions), viable[0].course_demand[viable[1]])
+            if viable is not None else NO_CANDIDATES
+            for viable, _ in jobs
         ]
 
-        return RecommendationResponse(recommendations=recommendations)
\ No newline at end of file
+    def _viable_rows(self, state: ServingState, input_data: StudentInput, cross_stream: bool):
+        """The candidate set and the rows of it worth scoring, or None when nothing is."""
+        candidates = state.candidate_index.get(CROSS_STREAM if cross_stream else input_data.stream)
+        # Students without a qualifying z-score (NQC) have no viable courses
+        if candidates is None or len(candidates) == 0 or input_data.zscore == -10:
+            return None
+        # Courses whose average z-score is more than 0.5 above the student's are never shown
+        rows = np.flatnonzero(input_data.zscore - candidates.course_avg_zscore >= -0.5)
+        if len(rows) == 0:
+            return None
+        return candidates, rows
@@ -0,0 +1,115 @@
+"""Opt-in sampling profiler producing flame-graph-ready collapsed stacks.
+
+Arm it for the next N requests; while any of those requests is in flight a
+background thread samples every thread's Python stack. The result is in the
+"collapsed" format (``frame;frame;frame count`` per line) understood by
+flamegraph.pl, speedscope and inferno.
+"""
+from collections import Counter
+import os
+import sys
+import threading
+import time
+
+# (file, function) of the leaf frame of a parked thread: the event loop's select,
+# lock and condition waits, and pool workers blocked on their queue (a C call,
+# so their leaf Python frame is the worker loop itself)
+IDLE_FRAMES = {
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker')
+}
+
+
+def _is_idle(frame):
+    code = frame.f_code
+    return (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._in_flight = 0
+        self._interval = 0.005
+        self._samples = Counter()
+        self._sample_count = 0
+        self._thread = None
+        self._wake = threading.Event()
+        self.last_profile = None
+
+    @property
+    def armed(self):
+        return self._remaining > 0 or self._in_flight > 0
+
+    def arm(self, requests, interval_ms=5.0):
+        with self._lock:
+            if self.armed:
+                raise RuntimeError("A profile is already being captured")
+            self._remaining = requests
+            self._interval = interval_ms / 1000
+            self._samples = Counter()
+            self._sample_count = 0
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def status(self):
+        with self._lock:
+            return {
+                'armed': self.armed,
+                'remaining_requests': self._remaining,
+                'in_flight': self._in_flight,
+                'samples': self._sample_count,
+                'profile_ready': self.last_profile is not None
+            }
+
+    def request_started(self):
+        """Return True when this request is being profiled (call request_finished afterwards)."""
+        if self._remaining <= 0:
+            return False
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            self._in_flight += 1
+        self._wake.set()
+        return True
+
+    def request_finished(self):
+        with self._lock:
+            self._in_flight -= 1
+            done = self._remaining <= 0 and self._in_flight == 0
+        if done:
+            self._wake.set()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                if self._remaining <= 0 and self._in_flight == 0:
+                    self.last_profile = self._collapsed()
+                    return
+                sampling = self._in_flight > 0
+            if not sampling:
+                self._wake.wait(0.1)
+                self._wake.clear()
+                continue
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or _is_idle(frame):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+                    frame = frame.f_back
+                self._samples[';'.join(reversed(stack))] += 1
+            self._sample_count += 1
+            time.sleep(self._interval)
+
+    def _collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self._samples.most_common())
+
+
+PROFILER = SamplingProfiler()
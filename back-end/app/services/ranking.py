@@ -0,0 +1,78 @@
+from typing import Optional
+import numpy as np
+from app.models.schemas import CourseRecommendation, RecommendationResponse
+from app.services.metrics import timed
+
+
+def rank_descending(scores):
+    """Positions of ``scores`` from highest to lowest; equal scores keep candidate order."""
+    return np.argsort(-scores, kind='stable')
+
+
+def top_rows(scores, k):
+    """Sorted positions of the ``k`` best scores, the earliest candidates winning ties at the cut."""
+    cutoff = np.partition(scores, len(scores) - k)[len(scores) - k]
+    above = np.flatnonzero(scores > cutoff)
+    at_cutoff = np.flatnonzero(scores == cutoff)[:k - len(above)]
+    return np.union1d(above, at_cutoff)
+
+
+class RankedCandidates:
+    """Predicted scores of the viable candidates for one request.
+
+    Nothing is sorted up front: ``select`` partitions out only the rows a
+    page needs, so ranking and serialization cost follow the page size
+    rather than the number of candidates. A page is always a slice of the
+    full ranking.
+    """
+
+    def __init__(self, courses, universities, scores, demand):
+        self.courses = courses
+        self.universities = universities
+        self.scores = scores
+        self.demand = demand
+        self._full_response = None
+
+    def __len__(self):
+        return len(self.scores)
+
+    def count(self, min_score: Optional[float] = None) -> int:
+        if min_score is None:
+            return len(self.scores)
+        return int(np.count_nonzero(self.scores >= min_score))
+
+    def select(self, top_k: Optional[int] = None, min_score: Optional[float] = None, offset: int = 0):
+        """Row positions ranked [offset, offset + top_k) among rows scoring at least ``min_score``."""
+        rows = np.arange(len(self.scores))
+        if min_score is not None:
+            rows = rows[self.scores >= min_score]
+        if top_k is None:
+            return rows[rank_descending(self.scores[rows])][offset:]
+
+        end = offset + top_k
+        if end < len(rows):
+            # Partition out the `end` best rows so only those get sorted
+            rows = rows[top_rows(self.scores[rows], end)]
+        return rows[rank_descending(self.scores[rows])][offset:end]
+
+    def to_response(self, top_k: Optional[int] = None, min_score: Optional[float] = None,
+                    offset: int = 0) -> RecommendationResponse:
+        full = top_k is None and min_score is None and offset == 0
+        if full and self._full_response is not None:
+            return self._full_response
+
+        with timed('ranking'):
+            rows = self.select(top_k, min_score, offset)
+        with timed('serialization'):
+            # Python scalars straight from the column arrays; the values need no validation
+            recommendations = [
+                CourseRecommendation.model_construct(
+                    course=course, university=university, predicted_score=score, demand_score=demand)
+                for course, university, score, demand in zip(
+                    self.courses[rows].tolist(), self.universities[rows].tolist(),
+                    self.scores[rows].tolist(), self.demand[rows].tolist())
+            ]
+            response = RecommendationResponse.model_construct(recommendations=recommendations)
+        if full:
+            self._full_response = response
+        return response
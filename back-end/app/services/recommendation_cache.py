@@ -0,0 +1,82 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class RecommendationCache:
+    """Thread-safe LRU cache with TTL for recommendation responses.
+
+    Keys are built from (model version, candidate set, district, stream,
+    quantized z-score); the model version makes entries computed against a
+    previous model unreachable even if they are inserted after a reload.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, zscore_quantum: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.zscore_quantum = zscore_quantum
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def quantize(self, zscore: float) -> float:
+        if self.zscore_quantum <= 0:
+            return zscore
+        return round(round(zscore / self.zscore_quantum) * self.zscore_quantum, 10)
+
+    def key(self, model_version: int, cross_stream: bool, district: str, stream: str, zscore: float):
+        return (model_version, cross_stream, district, stream, self.quantize(zscore))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def retain_versions(self, versions):
+        """Drop the entries of every model version not in ``versions``."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] not in versions]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'zscore_quantum': self.zscore_quantum
+            }
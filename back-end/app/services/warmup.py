@@ -0,0 +1,66 @@
+"""Startup warm-up: score common requests before the worker reports ready.
+
+The first requests after a deploy otherwise pay for paging in the
+memory-mapped artifact, LightGBM's first predict call and cold NumPy and
+pydantic paths. Warm-up scores the most common (district, stream) pairs at
+a few z-score bands through the normal batch path, which also leaves
+those recommendations in the response cache.
+"""
+import asyncio
+import time
+
+from app.models.features import CROSS_STREAM
+from app.models.schemas import StudentInput
+
+
+def common_pairs(model, limit):
+    """The ``limit`` (district, stream) pairs with the most historical rows, most common first.
+
+    The artifact keeps row counts per district and per stream, not per pair,
+    so a pair is weighted by the product of the two.
+    """
+    district_rows = model.district_course_count.groupby(level=0).sum()
+    stream_rows = model.stream_course_count.groupby(level=0).sum()
+    pairs = [(district, stream) for district in model.districts for stream in model.streams
+             if stream != CROSS_STREAM]
+    pairs.sort(key=lambda pair: -district_rows.get(pair[0], 0) * stream_rows.get(pair[1], 0))
+    return pairs[:limit] if limit > 0 else pairs
+
+
+class WarmUp:
+    """Warm-up progress; ``ready`` once it has finished or when it is disabled."""
+
+    def __init__(self, enabled=True):
+        self.state = 'pending' if enabled else 'disabled'
+        self.requests = 0
+        self.seconds = None
+        self.error = None
+
+    @property
+    def ready(self):
+        return self.state in ('done', 'disabled')
+
+    def status(self):
+        return {'ready': self.ready, 'warmup': self.state, 'requests': self.requests,
+                'seconds': self.seconds, 'error': self.error}
+
+    async def run(self, ml_service, run_scoring, pairs, zscores, batch_size):
+        """Score every pair at every z-score, in and cross stream, as batches on the scoring pool."""
+        self.state = 'running'
+        start = time.perf_counter()
+        try:
+            students = [StudentInput(district=district, stream=stream, zscore=zscore)
+                        for district, stream in pairs for zscore in zscores]
+            batches = [students[i:i + batch_size] for i in range(0, len(students), batch_size)]
+            await asyncio.gather(*(
+                run_scoring(ml_service.recommend_courses_batch, batch, cross_stream)
+                for batch in batches for cross_stream in (False, True)
+            ))
+            self.requests = 2 * len(students)
+            self.state = 'done'
+        except Exception as e:
+            # A model that cannot score these inputs cannot serve traffic either
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = 'failed'
+        finally:
+            self.seconds = time.perf_counter() - start
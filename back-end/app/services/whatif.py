@@ -0,0 +1,178 @@
+"""Precomputed recommendation lists over a z-score grid, for what-if queries.
+
+``build_whatif_table`` scores every (district, stream, candidate set) at
+each grid z-score, offline, and stores the ranked viable candidates in one
+columnar ``.npz`` file:
+
+    grid                      sorted z-scores; entry i covers [grid[i], grid[i+1])
+    key_district/stream/cross one entry per (district, stream, cross_stream)
+    offsets                   CSR row pointers, row = key * len(grid) + grid index
+    items / scores            candidate ids in rank order and their predicted scores
+    item_course/university    the candidate table items point into
+
+Answering a query is two binary searches and two slices; no inference.
+"""
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from app.models.features import CROSS_STREAM
+from app.services.ranking import rank_descending
+
+WHATIF_FORMAT_VERSION = 1
+
+# Feature rows per predict call while building
+BUILD_CHUNK_ROWS = 65536
+
+
+def model_fingerprint(model):
+    """Identifies the booster and encoders a table was built with."""
+    booster = getattr(model.model, 'booster_', model.model)
+    digest = hashlib.sha1(booster.model_to_string().encode())
+    for encoder in model.label_encoders.values():
+        digest.update('\x00'.join(map(str, encoder.classes_.tolist())).encode())
+    return digest.hexdigest()
+
+
+def build_whatif_table(service, path, grid, log=print):
+    """Sweep ``grid`` for every known (district, stream) with ``service``'s current model."""
+    state = service.state
+    model = state.model
+    grid = np.round(np.asarray(sorted(set(grid)), dtype=np.float64), 4)
+
+    # One id per (candidate set, row) so items from every set share a table
+    set_offsets, courses, universities = {}, [], []
+    for name, candidates in state.candidate_index.candidates.items():
+        set_offsets[name] = sum(len(c) for c in courses)
+        courses.append(candidates.courses)
+        universities.append(candidates.universities)
+
+    keys = [(district, stream, cross)
+            for district in model.districts for stream in model.streams for cross in (False, True)]
+    offsets = [0]
+    items, scores = [], []
+    start = time.perf_counter()
+    for k, (district, stream, cross) in enumerate(keys):
+        name = CROSS_STREAM if cross else stream
+        candidates = state.candidate_index.get(name)
+        lists = _sweep(state, candidates, district, stream, grid) if candidates is not None else None
+        for g in range(len(grid)):
+            ids, values = lists[g] if lists is not None else (np.empty(0, np.int64), np.empty(0))
+            items.append(ids + set_offsets.get(name, 0))
+            scores.append(values)
+            offsets.append(offsets[-1] + len(ids))
+        if log and (k + 1) % 50 == 0:
+            log(f"{k + 1}/{len(keys)} keys, {time.perf_counter() - start:.1f}s")
+
+    # Written aside and renamed, so a reloading service never reads a partial file
+    tmp_path = f'{path}.tmp-{os.getpid()}'
+    with open(tmp_path, 'wb') as f:
+        np.savez(
+            f,
+            format_version=np.int64(WHATIF_FORMAT_VERSION),
+            model_fingerprint=np.str_(model_fingerprint(model)),
+            grid=grid,
+            key_district=np.asarray([k[0] for k in keys], dtype=str),
+            key_stream=np.asarray([k[1] for k in keys], dtype=str),
+            key_cross=np.asarray([k[2] for k in keys], dtype=bool),
+            offsets=np.asarray(offsets, dtype=np.int64),
+            items=np.concatenate(items).astype(np.int32),
+            scores=np.concatenate(scores).astype(np.float32),
+            item_course=np.concatenate(courses).astype(str),
+            item_university=np.concatenate(universities).astype(str)
+        )
+    os.replace(tmp_path, path)
+    return len(keys) * len(grid)
+
+
+def _sweep(state, candidates, district, stream, grid):
+    """(candidate rows in rank order, scores) at each grid z-score."""
+    index = state.candidate_index
+    results = []
+    step = max(1, BUILD_CHUNK_ROWS // max(1, len(candidates)))
+    for chunk in range(0, len(grid), step):
+        zscores = grid[chunk:chunk + step]
+        # Same filters as MLService: NQC scores nothing, far-above-average courses never show
+        jobs = [np.flatnonzero(z - candidates.course_avg_zscore >= -0.5) if z != -10
+                else np.empty(0, np.int64) for z in zscores]
+        scored = [(z, rows) for z, rows in zip(zscores, jobs) if len(rows)]
+        predictions = iter(())
+        if scored:
+            features = np.vstack([index.build_features(candidates, district, stream, z, rows)
+                                  for z, rows in scored])
+            predictions = iter(np.split(state.engine.predict(features),
+                                        np.cumsum([len(rows) for _, rows in scored])[:-1]))
+        for rows in jobs:
+            if not len(rows):
+                results.append((rows, np.empty(0)))
+                continue
+            values = next(predictions)
+            order = rank_descending(values)
+            results.append((rows[order], values[order]))
+    return results
+
+
+class WhatIfTable:
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            self._load(data)
+
+    def _load(self, data):
+        if int(data['format_version']) != WHATIF_FORMAT_VERSION:
+            raise ValueError(f"What-if table format {int(data['format_version'])} is not supported")
+        self.model_fingerprint = str(data['model_fingerprint'])
+        self.grid = data['grid']
+        self.offsets = data['offsets']
+        self.items = data['items']
+        self.scores = data['scores']
+        self.item_course = data['item_course']
+        self.item_university = data['item_university']
+        self.keys = {
+            (district, stream, bool(cross)): k
+            for k, (district, stream, cross) in enumerate(
+                zip(data['key_district'].tolist(), data['key_stream'].tolist(), data['key_cross']))
+        }
+
+    def grid_point(self, zscore):
+        """Index of the grid interval holding ``zscore``, clamped to the grid."""
+        return int(np.clip(np.searchsorted(self.grid, zscore, side='right') - 1, 0, len(self.grid) - 1))
+
+    def ranked(self, district, stream, cross_stream, zscore):
+        """(grid z-score used, candidate ids in rank order, scores), or None for an unknown key."""
+        k = self.keys.get((district, stream, cross_stream))
+        if k is None:
+            return None
+        g = self.grid_point(zscore)
+        row = k * len(self.grid) + g
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return float(self.grid[g]), self.items[start:end], self.scores[start:end]
+
+    def compare(self, district, stream, cross_stream, from_zscore, to_zscore):
+        """Courses gained, lost and moved between two z-scores, or None for an unknown key."""
+        before = self.ranked(district, stream, cross_stream, from_zscore)
+        after = self.ranked(district, stream, cross_stream, to_zscore)
+        if before is None:
+            return None
+        (from_grid, from_items, from_scores), (to_grid, to_items, to_scores) = before, after
+        from_rank = {item: rank for rank, item in enumerate(from_items.tolist(), 1)}
+        to_rank = {item: rank for rank, item in enumerate(to_items.tolist(), 1)}
+
+        def course(item, rank, score):
+            return {'course': str(self.item_course[item]), 'university': str(self.item_university[item]),
+                    'rank': rank, 'predicted_score': score}
+
+        return {
+            'from_zscore': from_grid,
+            'to_zscore': to_grid,
+            'opened': [course(item, rank, score) for (item, rank), score
+                       in zip(to_rank.items(), to_scores.tolist()) if item not in from_rank],
+            'closed': [course(item, rank, score) for (item, rank), score
+                       in zip(from_rank.items(), from_scores.tolist()) if item not in to_rank],
+            'moved': [
+                {'course': str(self.item_course[item]), 'university': str(self.item_university[item]),
+                 'from_rank': from_rank[item], 'to_rank': rank}
+                for item, rank in to_rank.items() if item in from_rank and from_rank[item] != rank
+            ]
+        }
@@ -0,0 +1,64 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage (from back-end/):
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.10]
+
+Exits with status 1 when any latency grew, or throughput dropped, by more
+than the threshold (relative).
+"""
+import argparse
+import json
+import sys
+
+LOWER_IS_BETTER = ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'peak_rss_mb')
+HIGHER_IS_BETTER = ('throughput_rps',)
+
+
+def flatten(results, prefix=''):
+    for key, value in results.items():
+        name = f'{prefix}{key}'
+        if isinstance(value, dict):
+            yield from flatten(value, name + '.')
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, float(value)
+
+
+def compare(baseline, candidate, threshold):
+    base = dict(flatten(baseline['results']))
+    rows, regressions = [], []
+    for name, new in flatten(candidate['results']):
+        metric = name.rsplit('.', 1)[-1]
+        if name not in base or metric not in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            continue
+        old = base[name]
+        change = (new - old) / old if old else 0.0
+        worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+        rows.append((name, old, new, change, worse))
+        if worse:
+            regressions.append(name)
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.10)
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline {baseline.get('revision')}  candidate {candidate.get('revision')}")
+    rows, regressions = compare(baseline, candidate, args.threshold)
+    for name, old, new, change, worse in rows:
+        print(f"{'!!' if worse else '  '} {name:60s} {old:12.3f} -> {new:12.3f} ({change:+.1%})")
+    if regressions:
+        print(f'{len(regressions)} regression(s) above {args.threshold:.0%}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""End-to-end load generator for the recommendation API.
+
+Drives the FastAPI app in-process through its ASGI interface (no network,
+no extra client dependency) with a fixed number of concurrent clients.
+
+Usage (from back-end/):
+    python -m benchmarks.load_test [--requests 2000] [--concurrency 16] [--no-cache]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from benchmarks.common import peak_rss_mb, percentiles, write_results
+
+ENDPOINTS = ['/api/v1/recommend', '/api/v1/recommend_cross_stream', '/api/v1/recommend/all']
+# How often to check whether the startup warm-up has finished
+WARMUP_POLL_SECONDS = 0.1
+
+
+async def asgi_request(app, method, path, body=None):
+    """Send one HTTP request to an ASGI app and return (status, body bytes)."""
+    payload = json.dumps(body).encode() if body is not None else b''
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'root_path': '',
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(payload)).encode())],
+        'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 80)
+    }
+    request_sent = False
+    response = {'status': None, 'body': []}
+    disconnect = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': payload, 'more_body': False}
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            response['body'].append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    disconnect.set()
+    return response['status'], b''.join(response['body'])
+
+
+async def run_load(app, endpoint, requests, concurrency, bodies):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(bodies[i % len(bodies)])
+
+    async def client():
+        nonlocal errors
+        while True:
+            try:
+                body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            status, _ = await asgi_request(app, 'POST', endpoint, body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'throughput_rps': requests / elapsed,
+        **percentiles(latencies)
+    }
+
+
+async def main_async(args):
+    from app.main import app
+    from app import dependencies
+
+    async with app.router.lifespan_context(app):
+        # The startup warm-up scores on the same pool and fills the cache; a run
+        # started before it finishes measures both
+        while not dependencies.warmup.ready:
+            if dependencies.warmup.state == 'failed':
+                raise RuntimeError(f"Warm-up failed: {dependencies.warmup.error}")
+            await asyncio.sleep(WARMUP_POLL_SECONDS)
+        model = dependencies.ml_service.model
+        rng = random.Random(args.seed)
+        streams = [s for s in model.streams if s in model.stream_candidates]
+        bodies = [
+            {'district': rng.choice(model.districts), 'stream': rng.choice(streams),
+             'zscore': round(rng.uniform(-1.0, 2.5), 4)}
+            for _ in range(args.distinct_inputs)
+        ]
+        results = {}
+        for endpoint in ENDPOINTS:
+            await run_load(app, endpoint, min(50, args.requests), args.concurrency, bodies)  # warm-up
+            dependencies.ml_service.cache.clear()
+            results[endpoint] = await run_load(app, endpoint, args.requests, args.concurrency, bodies)
+        results['peak_rss_mb'] = peak_rss_mb()
+        results['cache'] = dependencies.ml_service.cache.stats()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--distinct-inputs', type=int, default=500,
+                        help='number of distinct (district, stream, zscore) bodies cycled through')
+    parser.add_argument('--no-cache', action='store_true', help='disable the recommendation cache')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/...)')
+    args = parser.parse_args()
+
+    if args.no_cache:
+        # Read by app.config at import time
+        os.environ['RECOMMENDATION_CACHE_MAX_ENTRIES'] = '0'
+
+    results = asyncio.run(main_async(args))
+    for name, stats in results.items():
+        print(f'{name:32s} {stats}')
+    print('written to', write_results('load', {**results, 'args': vars(args)}, args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Memory report: the preprocessed frame before/after compaction, and serving process RSS.
+
+Each serving scenario starts MLService in a fresh interpreter so the numbers
+do not include what earlier scenarios allocated.
+
+Usage (from back-end/):
+    python -m benchmarks.memory [--output results.json]
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from app import config
+from app.models.prediction_model import PredictionModel
+from benchmarks.common import peak_rss_mb, write_results
+
+SCENARIOS = {
+    # name -> (LOW_MEMORY_SERVING, build a fresh artifact from the CSV first)
+    'csv_keep_frame': ('0', True),
+    'csv_low_memory': ('1', True),
+    'artifact_attach': ('1', False),
+}
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def frame_report():
+    report = {}
+    for name, compact in [('before', False), ('after', True)]:
+        model = PredictionModel()
+        model.load_data(config.DATASET_PATH, compact=compact)
+        usage = model.df.memory_usage(deep=True, index=False)
+        report[name] = {
+            'rows': len(model.df),
+            'columns': len(model.df.columns),
+            'total_mb': usage.sum() / 1e6,
+            'per_column_kb': {col: round(size / 1e3, 1) for col, size in usage.items()}
+        }
+    report['reduction'] = 1 - report['after']['total_mb'] / report['before']['total_mb']
+    return report
+
+
+def serving_scenario(name):
+    """Runs in the child process: start MLService and report its memory."""
+    from app.services.ml_service import MLService
+    service = MLService(config.DATASET_PATH, config.MODEL_PATH, os.environ['ARTIFACT_PATH'])
+    gc.collect()
+    frame = service.model.df
+    return {
+        'rss_mb': current_rss_mb(),
+        'peak_rss_mb': peak_rss_mb(),
+        'frame_mb': frame.memory_usage(deep=True).sum() / 1e6 if frame is not None else 0.0
+    }
+
+
+def run_scenario(name):
+    low_memory, fresh = SCENARIOS[name]
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_path = os.path.join(tmp, 'artifact') if fresh else config.ARTIFACT_PATH
+        env = {**os.environ, 'LOW_MEMORY_SERVING': low_memory, 'ARTIFACT_PATH': artifact_path}
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'benchmarks.memory', '--scenario', name],
+            env=env, text=True, stderr=subprocess.DEVNULL)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/...)')
+    parser.add_argument('--scenario', choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(serving_scenario(args.scenario)))
+        return
+
+    results = {'frame': frame_report()}
+    before, after = results['frame']['before'], results['frame']['after']
+    print(f"frame   {before['total_mb']:.1f} MB ({before['columns']} columns) -> "
+          f"{after['total_mb']:.1f} MB ({after['columns']} columns)")
+    results['serving'] = {}
+    for name in SCENARIOS:
+        results['serving'][name] = run_scenario(name)
+        print(f'{name:16s} {results["serving"][name]}')
+    print('written to', write_results('memory', results, args.output))
+
+
+if __name__ == '__main__':
+    main()
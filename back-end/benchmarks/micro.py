@@ -0,0 +1,95 @@
+"""Microbenchmarks for the model pipeline stages.
+
+Usage (from back-end/):
+    python -m benchmarks.micro [--repeat 50] [--output results.json]
+"""
+import argparse
+import random
+
+import numpy as np
+import pandas as pd
+
+from app import config
+from app.models.prediction_model import CSV_CHUNK_ROWS, PredictionModel
+from app.models.schemas import StudentInput
+from app.services.candidate_index import CandidateIndex
+from app.services.ml_service import MLService
+from benchmarks.common import peak_rss_mb, time_call, write_results
+
+
+def sample_inputs(model, count, seed=0):
+    rng = random.Random(seed)
+    streams = [s for s in model.streams if s in model.stream_candidates]
+    return [
+        StudentInput(district=rng.choice(model.districts), stream=rng.choice(streams),
+                     zscore=round(rng.uniform(-1.0, 2.5), 4))
+        for _ in range(count)
+    ]
+
+
+def run(repeat):
+    results = {}
+
+    def load_data():
+        # Both chunked passes, CSV parsing included (named apart from the old in-memory preprocess stage)
+        PredictionModel().load_data(config.DATASET_PATH, chunksize=CSV_CHUNK_ROWS)
+
+    results['read_csv'] = time_call(lambda: pd.read_csv(config.DATASET_PATH), max(3, repeat // 10))
+    results['load_data'] = time_call(load_data, max(3, repeat // 10))
+
+    service = MLService(config.DATASET_PATH, config.MODEL_PATH, config.ARTIFACT_PATH)
+    model = service.model
+    results['load_artifact'] = time_call(
+        lambda: PredictionModel().load_artifact(config.ARTIFACT_PATH), max(3, repeat // 10))
+    results['candidate_index'] = time_call(lambda: CandidateIndex(model), max(3, repeat // 10))
+
+    inputs = sample_inputs(model, repeat)
+    index = service.candidate_index
+    jobs = [(index.get(i.stream), i) for i in inputs]
+    iterator = iter(jobs * 2)
+
+    def encode():
+        candidates, i = next(iterator)
+        return index.build_features(candidates, i.district, i.stream, i.zscore)
+
+    results['build_features'] = time_call(encode, repeat)
+
+    features = [index.build_features(c, i.district, i.stream, i.zscore) for c, i in jobs]
+    booster = service.engine.booster
+    for name, predict in [('predict_engine', service.engine.predict),
+                          ('predict_booster', booster.predict)]:
+        iterator = iter(features * 2)
+        results[name] = time_call(lambda: predict(next(iterator)), repeat)
+    results['candidate_rows'] = {
+        'mean': float(np.mean([len(f) for f in features])),
+        'max': int(max(len(f) for f in features))
+    }
+
+    for name, recommend in [('recommend_courses', service.recommend_courses),
+                            ('recommend_cross_stream_courses', service.recommend_cross_stream_courses)]:
+        iterator = iter(inputs * 2)
+
+        def uncached():
+            service.cache.clear()
+            return recommend(next(iterator))
+
+        results[name] = time_call(uncached, repeat)
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--output', help='JSON file to write (default: benchmarks/results/...)')
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    for name, stats in results.items():
+        print(f'{name:32s} {stats}')
+    print('written to', write_results('micro', results, args.output))
+
+
+if __name__ == '__main__':
+    main()
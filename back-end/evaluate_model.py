@@ -1,4 +1,4 @@
-from app.models.prediction_model import PredictionModel
+from app.models.prediction_model import PredictionModel, EVALUATION_CUTOFFS
 import os
 
 def evaluate_model():
@@ -8,21 +8,28 @@ def evaluate_model():
     # Paths
     data_path = os.path.join('data', 'dataset.csv')
     model_path = os.path.join('data', 'trained_model.pkl')
+    artifact_path = os.path.join('data', 'artifact')
     
     # Load data and train or load model
-    model.load_data(data_path)
     if not os.path.exists(model_path):
+        model.load_data(data_path)
         print("Training model...")
         model.train_model(model_path)
+        model.save_artifact(artifact_path)
     else:
         print("Loading pre-trained model...")
         model.load_model(model_path)
+        model.load_data(data_path, encoders=model.label_encoders)
     
     # Evaluate model
     results = model.evaluate_model()
     print("Evaluation Results:")
-    print(f"Average NDCG@5: {results['NDCG@5']:.4f}")
+    for k in EVALUATION_CUTOFFS:
+        print(f"Average NDCG@{k}: {results[f'NDCG@{k}']:.4f}")
+    print(f"MAP: {results['MAP']:.4f}")
     print(f"Number of groups evaluated: {results['num_groups_evaluated']}")
+    if not results['held_out']:
+        print("The model was also trained on these groups; the scores are not held-out estimates.")
 
 if __name__ == "__main__":
     evaluate_model()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import argparse
+import csv
+import json
+import urllib.request
+import pandas as pd
+from app import config
+from app.models.artifact import record_dataset
+from app.models.prediction_model import RAW_COLUMNS, WARM_START_ROUNDS
+from app.services.ml_service import load_prediction_model
+
+def append_rows(dataset_path, raw_rows):
+    # Keep dataset.csv the full history, so a later from-scratch build sees the new years too
+    with open(dataset_path, newline='') as f:
+        columns = next(csv.reader(f))
+    with open(dataset_path, 'rb+') as f:
+        f.seek(-1, 2)
+        needs_newline = f.read(1) != b'\n'
+    with open(dataset_path, 'a', newline='') as f:
+        if needs_newline:
+            f.write('\n')
+        raw_rows[columns].to_csv(f, header=False, index=False)
+
+def reload_service(url, admin_token):
+    request = urllib.request.Request(url, method='POST', headers={'X-Admin-Token': admin_token or ''})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.load(response)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Add a new exam year's cut-off marks without reprocessing the existing years")
+    parser.add_argument("csv", help=f"rows for the new year(s), with columns {', '.join(RAW_COLUMNS)}")
+    parser.add_argument("--warm-start-rounds", type=int, default=WARM_START_ROUNDS,
+                        help="boosting rounds added on the new rows (0 keeps the current model)")
+    parser.add_argument("--no-append", action="store_true", help="leave dataset.csv unchanged")
+    parser.add_argument("--reload-url", help="e.g. http://localhost:8000/api/v1/admin/reload (sends ADMIN_TOKEN)")
+    args = parser.parse_args()
+
+    raw_rows = pd.read_csv(args.csv)
+    model = load_prediction_model(config.DATASET_PATH, config.MODEL_PATH, config.ARTIFACT_PATH)
+    rows = model.ingest(raw_rows)
+    print(f"Ingested {len(raw_rows)} rows ({len(rows)} in rankable groups), "
+          f"latest exam year {model.latest_exam_year}")
+
+    if args.warm_start_rounds > 0:
+        print(f"Warm-starting the ranker for {args.warm_start_rounds} rounds...")
+        model.warm_start(rows, config.MODEL_PATH, args.warm_start_rounds)
+    else:
+        # Same booster, but the encoders saved with it now know the new classes
+        model.save_model(config.MODEL_PATH)
+
+    # Swapped in atomically; running workers pick it up on reload. Written before
+    # dataset.csv so a failed run is refused as a duplicate rather than appended twice.
+    model.save_artifact(config.ARTIFACT_PATH)
+    print(f"Artifact written to {config.ARTIFACT_PATH}")
+    if not args.no_append:
+        append_rows(config.DATASET_PATH, raw_rows)
+        # The bundle already holds these rows; without this the next load would rebuild it from the CSV
+        record_dataset(config.ARTIFACT_PATH, config.DATASET_PATH)
+
+    if args.reload_url:
+        print(f"Reloaded: {reload_service(args.reload_url, config.ADMIN_TOKEN)}")
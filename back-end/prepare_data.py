@@ -0,0 +1,28 @@
+import argparse
+import os
+import time
+from app import config
+from app.models.prediction_model import CSV_CHUNK_ROWS, PredictionModel
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Stream a cut-off CSV into LightGBM binary Datasets and optionally train from them")
+    parser.add_argument("csv", nargs="?", default=config.DATASET_PATH)
+    parser.add_argument("--chunksize", type=int, default=CSV_CHUNK_ROWS, help="CSV rows read at a time")
+    parser.add_argument("--output", default=os.path.join(config.DATA_DIR, "training"),
+                        help="directory for train.bin, valid.bin and dataset.json")
+    parser.add_argument("--train", action="store_true",
+                        help="train on the binaries and install the model and artifact")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = PredictionModel()
+    manifest = model.write_training_data(args.csv, args.output, args.chunksize)
+    print(f"{manifest['rows']} rows in {manifest['train_groups'] + manifest['valid_groups']} groups "
+          f"({manifest['train_rows']} train, {manifest['valid_rows']} held out) written to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    if args.train:
+        model.train_from_binary(args.output, config.MODEL_PATH)
+        model.save_artifact(config.ARTIFACT_PATH)
+        print(f"Model written to {config.MODEL_PATH}, artifact to {config.ARTIFACT_PATH}")
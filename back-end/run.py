@@ -1,9 +1,30 @@
+import argparse
+import os
 import uvicorn
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the recommendation API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", 1)),
+                        help="worker processes; more than one disables auto-reload")
+    args = parser.parse_args()
+
+    # Read by every worker (config.WORKERS)
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    if args.workers > 1:
+        # Build the artifact once here; workers memory-map it read-only instead of
+        # each parsing the CSV, and the OS page cache shares the pages between them.
+        from app.dependencies import prepare_artifact
+        prepare_artifact()
+        # Workers already split the cores, so keep LightGBM single-threaded in each one
+        os.environ.setdefault("PREDICT_THREADS", "1")
+        os.environ.setdefault("SCORING_THREADS", "2")
+
     uvicorn.run(
         "app.main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True
-    )
\ No newline at end of file
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        reload=args.workers == 1
+    )
@@ -0,0 +1,107 @@
+"""load_prediction_model must not serve a bundle built from another dataset or model file."""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import config
+from app.models.artifact import ArtifactError, check_sources, file_sha1, record_dataset
+from app.models.prediction_model import PredictionModel
+from app.services.ml_service import load_prediction_model
+
+
+@pytest.fixture
+def paths(tmp_path):
+    data_path = str(tmp_path / 'dataset.csv')
+    model_path = str(tmp_path / 'trained_model.pkl')
+    shutil.copy(config.DATASET_PATH, data_path)
+    model = load_prediction_model(data_path, model_path, str(tmp_path / 'artifact'))
+    assert model.df is not None
+    return data_path, model_path, str(tmp_path / 'artifact')
+
+
+def built_from_csv(paths):
+    return load_prediction_model(*paths).df is not None
+
+
+def test_unchanged_sources_reuse_the_artifact(paths):
+    assert not built_from_csv(paths)
+
+
+def test_edited_dataset_and_deleted_model_retrain(paths):
+    data_path, model_path, _ = paths
+    old_booster = file_sha1(model_path)
+    with open(data_path) as f:
+        lines = f.readlines()
+    with open(data_path, 'w') as f:
+        f.writelines(lines[:-200])
+    os.remove(model_path)
+
+    assert built_from_csv(paths)
+    assert os.path.exists(model_path) and file_sha1(model_path) != old_booster
+    assert not built_from_csv(paths)
+
+
+def test_replaced_model_file_rebuilds(paths):
+    _, model_path, artifact_path = paths
+    with open(model_path, 'a') as f:
+        f.write('\n')
+    with pytest.raises(ArtifactError):
+        check_sources(PredictionModel().load_artifact(artifact_path), paths[0], model_path)
+    assert built_from_csv(paths)
+
+
+def test_record_dataset_accepts_appended_rows(paths):
+    data_path, _, artifact_path = paths
+    with open(data_path, 'a') as f:
+        f.write('\n')
+    assert built_from_csv(paths)
+    with open(data_path, 'a') as f:
+        f.write('\n')
+    record_dataset(artifact_path, data_path)
+    assert not built_from_csv(paths)
+
+
+def test_ingest_after_load_artifact_matches_csv_model(paths):
+    data_path, model_path, artifact_path = paths
+    new_rows = pd.read_csv(data_path).query('`Exam Year` == 2023').assign(**{'Exam Year': 2024})
+    new_rows['Zscore'] = pd.to_numeric(new_rows['Zscore'], errors='coerce') + 0.05
+
+    from_csv = PredictionModel()
+    from_csv.load_data(data_path)
+    from_artifact = PredictionModel()
+    from_artifact.load_artifact(artifact_path)
+    assert from_artifact.course_zscores is None
+
+    from_csv.ingest(new_rows.copy())
+    from_artifact.ingest(new_rows.copy())
+    pd.testing.assert_series_equal(from_artifact.course_median_zscore.sort_index(),
+                                   from_csv.course_median_zscore.sort_index(), check_names=False)
+    assert len(from_artifact.course_zscores) == len(from_csv.course_zscores)
+
+
+def test_rebuild_after_ingest_keeps_the_served_codes(paths):
+    data_path, model_path, artifact_path = paths
+    new_rows = pd.read_csv(data_path).query('`Exam Year` == 2023').assign(**{'Exam Year': 2024})
+    # Sorts before every existing course, so a refitted encoder would shift all their codes
+    new_rows.loc[new_rows.index[:3], 'Course'] = 'AAA New Degree'
+    new_rows['Matched_Course_University'] = new_rows['Course'] + ' (' + new_rows['University'] + ')'
+
+    model = load_prediction_model(*paths)
+    model.warm_start(model.ingest(new_rows), model_path, num_boost_round=2)
+    model.save_artifact(artifact_path)
+    with open(data_path, 'a', newline='') as f:
+        new_rows.to_csv(f, header=False, index=False)
+    served = PredictionModel()
+    served.load_artifact(artifact_path)
+
+    rebuilt = load_prediction_model(*paths)
+    assert rebuilt.df is not None
+    evaluation = PredictionModel()
+    evaluation.load_data(data_path, encoders=served.label_encoders)
+    for encoders in (rebuilt.label_encoders, evaluation.label_encoders):
+        for col, encoder in served.label_encoders.items():
+            np.testing.assert_array_equal(encoders[col].classes_, encoder.classes_, err_msg=col)
+    assert served.label_encoders['Course'].encode('AAA New Degree') == len(served.label_encoders['Course'].classes_) - 1
@@ -0,0 +1,31 @@
+"""GroupedRanking.ndcg must match sklearn's ndcg_score group by group."""
+import numpy as np
+import pytest
+from sklearn.metrics import ndcg_score
+
+from app.models.evaluation import GroupedRanking
+
+
+def random_groups(rng, num_groups):
+    sizes = rng.integers(2, 30, num_groups)
+    groups = np.repeat(rng.permutation(num_groups), sizes)
+    relevance = rng.integers(0, 4, len(groups))
+    # Coarse scores so many predictions tie inside a group
+    scores = rng.integers(0, 6, len(groups)) / 2.0
+    # Rows of a group need not be contiguous
+    order = rng.permutation(len(groups))
+    return groups[order], relevance[order], scores[order]
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('k', [1, 5, 10, None])
+def test_ndcg_matches_sklearn(seed, k):
+    groups, relevance, scores = random_groups(np.random.default_rng(seed), 40)
+    ranking = GroupedRanking(groups, relevance, scores)
+
+    expected = [
+        ndcg_score([relevance[groups == group]], [scores[groups == group]], k=k)
+        for group in np.unique(groups)
+    ]
+    np.testing.assert_allclose(ranking.ndcg(k if k is not None else len(groups)), expected,
+                               rtol=0, atol=1e-12)
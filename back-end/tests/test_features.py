@@ -0,0 +1,141 @@
+"""Parity of the vectorized feature code with the original row-wise implementation.
+
+``reference_preprocess`` is the frame-building part of the original
+``PredictionModel._preprocess_data``, kept here as the specification.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from app import config
+from app.models.features import FEATURES, TARGET, district_competition, stream_course_compatibility
+from app.models.prediction_model import PredictionModel
+
+REFERENCE_STREAMS = ['Arts', 'Commerce', 'Biological Science', 'Physical Science',
+                     'Engineering Technology', 'Biosystems Technology', 'Cross Stream']
+
+
+def reference_district_competition(df, district_course_count):
+    return df.apply(
+        lambda x: district_course_count.get((x['District'], x['Matched_Course_University']), 0), axis=1)
+
+
+def reference_stream_compatibility(df, stream_course_count):
+    def calculate_stream_compatibility(row):
+        stream = row['Stream']
+        course = row['Matched_Course_University']
+        if stream == 'Cross Stream':
+            return sum(stream_course_count.get((s, course), 0) for s in REFERENCE_STREAMS)
+        return stream_course_count.get((stream, course), 0)
+    return df.apply(calculate_stream_compatibility, axis=1)
+
+
+def reference_preprocess(df):
+    df = df.rename(columns={'Exam Year': 'Exam_Year'})
+    for col in ['Exam_Year', 'District', 'Stream', 'Course', 'University']:
+        df[col] = df[col].fillna('Missing').astype(str)
+    df['Zscore_Values'] = pd.to_numeric(df['Zscore'], errors='coerce').fillna(-10)
+
+    bins = [-float('inf'), df['Zscore_Values'].quantile(0.25), df['Zscore_Values'].quantile(0.50),
+            df['Zscore_Values'].quantile(0.75), df['Zscore_Values'].quantile(0.90), float('inf')]
+    df['Zscore_Relevance'] = pd.cut(df['Zscore_Values'], bins=bins, labels=[0, 1, 2, 3, 4],
+                                    include_lowest=True).astype(int)
+    df['zscore_percentile'] = df['Zscore_Values'].rank(pct=True)
+
+    scored = df[df['Zscore_Values'] != -10]
+    course_avg_zscore = scored.groupby('Matched_Course_University')['Zscore_Values'].mean()
+    course_demand = scored.groupby('Matched_Course_University')['Zscore_Values'].median()
+    course_demand = (course_demand - course_demand.min()) / (course_demand.max() - course_demand.min() + 1e-10)
+    df['zscore_vs_course_avg'] = df['Zscore_Values'] - df['Matched_Course_University'].map(
+        course_avg_zscore).fillna(0)
+    df['course_demand'] = df['Matched_Course_University'].map(course_demand).fillna(0)
+
+    district_course_count = df.groupby(['District', 'Matched_Course_University']).size()
+    df['district_competition'] = reference_district_competition(df, district_course_count)
+    stream_course_count = df.groupby(['Stream', 'Matched_Course_University']).size()
+    df['stream_course_compatibility'] = reference_stream_compatibility(df, stream_course_count)
+
+    df['course_popularity'] = df['Matched_Course_University'].map(
+        df['Matched_Course_University'].value_counts())
+    df['Intake'] = df['Intake'].fillna(0)
+    df['intake_normalized'] = df['Intake'] / df['Intake'].max()
+    df['is_NQC'] = df['Zscore_Values'] == -10
+    for col in ['Exam_Year', 'District', 'Stream', 'Course', 'University', 'is_NQC']:
+        df[col + '_encoded'] = LabelEncoder().fit_transform(df[col])
+
+    df['group_id'] = df['District'] + '_' + df['Stream'] + '_' + df['Exam_Year'].astype(str)
+    group_sizes = df.groupby('group_id').size()
+    return df[df['group_id'].isin(group_sizes[group_sizes >= 2].index)]
+
+
+# Exact integer features, and floats that only differ by summation order
+EXACT_COLUMNS = ['Exam_Year_encoded', 'District_encoded', 'Stream_encoded', 'Course_encoded',
+                 'University_encoded', 'Zscore_Values', 'zscore_percentile', 'district_competition',
+                 'stream_course_compatibility', 'course_popularity', 'intake_normalized',
+                 'is_NQC_encoded', 'course_demand', TARGET]
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return pd.read_csv(config.DATASET_PATH)
+
+
+@pytest.fixture
+def small_frame():
+    return pd.DataFrame({
+        'District': ['Colombo', 'Colombo', 'Galle', 'Galle', 'Kandy', 'Jaffna'],
+        'Stream': ['Arts', 'Cross Stream', 'Commerce', 'Cross Stream', 'Arts', 'Unlisted Stream'],
+        'Matched_Course_University': ['Law (A)', 'Law (A)', 'Law (A)', 'Unseen (B)', 'Arts (C)', 'Law (A)']
+    })
+
+
+def test_lookups_match_reference_on_small_frame(small_frame):
+    counts = small_frame.iloc[:5]
+    district_course_count = counts.groupby(['District', 'Matched_Course_University']).size()
+    stream_course_count = pd.concat([
+        counts.groupby(['Stream', 'Matched_Course_University']).size(),
+        # A stream outside the known list must not count towards Cross Stream
+        pd.Series([7], index=pd.MultiIndex.from_tuples([('Unlisted Stream', 'Law (A)')]))
+    ])
+    np.testing.assert_array_equal(
+        district_competition(small_frame['District'], small_frame['Matched_Course_University'],
+                             district_course_count),
+        reference_district_competition(small_frame, district_course_count).to_numpy())
+    np.testing.assert_array_equal(
+        stream_course_compatibility(small_frame['Stream'], small_frame['Matched_Course_University'],
+                                    stream_course_count),
+        reference_stream_compatibility(small_frame, stream_course_count).to_numpy())
+
+
+def test_lookups_match_reference_on_dataset(dataset):
+    df = reference_preprocess(dataset.copy())
+    district_course_count = df.groupby(['District', 'Matched_Course_University']).size()
+    stream_course_count = df.groupby(['Stream', 'Matched_Course_University']).size()
+    np.testing.assert_array_equal(
+        district_competition(df['District'], df['Matched_Course_University'], district_course_count),
+        reference_district_competition(df, district_course_count).to_numpy())
+    np.testing.assert_array_equal(
+        stream_course_compatibility(df['Stream'], df['Matched_Course_University'], stream_course_count),
+        reference_stream_compatibility(df, stream_course_count).to_numpy())
+
+
+@pytest.mark.parametrize('chunksize', [None, 5000])
+def test_preprocessed_frame_matches_reference(dataset, chunksize):
+    expected = reference_preprocess(dataset.copy())
+    model = PredictionModel()
+    if chunksize is None:
+        model.load_data(config.DATASET_PATH, compact=False)
+    else:
+        model.load_data(config.DATASET_PATH, compact=False, chunksize=chunksize)
+    actual = model.df
+
+    np.testing.assert_array_equal(actual.index, expected.index)
+    np.testing.assert_array_equal(actual['group_id'], expected['group_id'])
+    for col in EXACT_COLUMNS:
+        np.testing.assert_array_equal(actual[col].to_numpy(dtype=np.float64),
+                                      expected[col].to_numpy(dtype=np.float64), err_msg=col)
+    # Means come from running sums and counts, so only the last bits may differ
+    np.testing.assert_allclose(actual['zscore_vs_course_avg'], expected['zscore_vs_course_avg'],
+                               rtol=0, atol=1e-12)
+    assert set(FEATURES) <= set(EXACT_COLUMNS) | {'zscore_vs_course_avg'}
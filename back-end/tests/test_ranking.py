@@ -0,0 +1,46 @@
+"""RankedCandidates pages must be slices of one full stable ranking, ties included."""
+import numpy as np
+import pytest
+
+from app.services.ranking import RankedCandidates, top_rows
+
+
+def stable_ranking(scores):
+    # Highest score first; equal scores keep candidate order
+    return sorted(range(len(scores)), key=lambda row: -scores[row])
+
+
+def random_candidates(rng):
+    n = int(rng.integers(0, 60))
+    # Few distinct values so ties fall inside pages and at their edges
+    scores = rng.integers(0, 8, n) / 4.0
+    names = np.array([f'course {i}' for i in range(n)], dtype=object)
+    return RankedCandidates(names, names, scores, np.zeros(n))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_select_pages_the_full_stable_ranking(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(50):
+        ranked = random_candidates(rng)
+        n = len(ranked)
+        min_score = None if rng.random() < 0.5 or n == 0 else float(rng.choice(ranked.scores))
+        top_k = None if rng.random() < 0.2 else int(rng.integers(1, n + 5))
+        offset = int(rng.integers(0, n + 3))
+
+        expected = [row for row in stable_ranking(ranked.scores)
+                    if min_score is None or ranked.scores[row] >= min_score]
+        expected = expected[offset:] if top_k is None else expected[offset:offset + top_k]
+        assert ranked.select(top_k, min_score, offset).tolist() == expected
+
+        page = ranked.to_response(top_k, min_score, offset).recommendations
+        assert [r.course for r in page] == ranked.courses[expected].tolist()
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_top_rows_keeps_the_earliest_rows_at_the_cut(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(100):
+        scores = rng.integers(0, 5, int(rng.integers(2, 40))) / 2.0
+        k = int(rng.integers(1, len(scores)))
+        assert top_rows(scores, k).tolist() == sorted(stable_ranking(scores)[:k])
@@ -0,0 +1,60 @@
+"""Every training path must treat the encoded columns as the shipped ranker does."""
+import pandas as pd
+import pytest
+
+from app import config
+from app.models.model_search import train_final
+from app.models.prediction_model import PredictionModel
+from app.models.tree_engine import CompiledRanker
+
+
+def categorical_splits(booster):
+    return len(CompiledRanker(booster).categorical_nodes)
+
+
+@pytest.fixture(scope='module')
+def trained(tmp_path_factory):
+    model = PredictionModel()
+    model.load_data(config.DATASET_PATH)
+    model.train_model(str(tmp_path_factory.mktemp('model') / 'trained_model.pkl'))
+    return model
+
+
+def test_train_model_splits_codes_numerically(trained):
+    assert categorical_splits(trained.model.booster_) == 0
+    assert trained.evaluate_model()['held_out'] is True
+
+
+def test_warm_start_keeps_the_feature_treatment(trained, tmp_path):
+    new_rows = pd.read_csv(config.DATASET_PATH).query('`Exam Year` == 2023').assign(**{'Exam Year': 2024})
+    rows = trained.ingest(new_rows)
+    base_trees = trained.model.booster_.num_trees()
+    trained.warm_start(rows, str(tmp_path / 'warm.txt'), num_boost_round=10)
+    assert trained.model.num_trees() > base_trees
+    assert categorical_splits(trained.model) == 0
+    assert trained.evaluation_held_out is False
+
+    # A rebuild from the model file and the CSV must not report held-out scores again
+    rebuilt = PredictionModel()
+    rebuilt.load_model(str(tmp_path / 'warm.txt'))
+    rebuilt.load_data(config.DATASET_PATH, encoders=rebuilt.label_encoders)
+    assert rebuilt.evaluate_model()['held_out'] is False
+
+
+def test_search_refit_uses_the_feature_treatment_and_is_not_held_out(tmp_path):
+    model = PredictionModel()
+    model.load_data(config.DATASET_PATH)
+    model.model = train_final(model.df, {'num_leaves': 15}, num_boost_round=5, num_threads=1)
+    model.evaluation_held_out = False
+    assert categorical_splits(model.model) == 0
+
+    model.save_artifact(str(tmp_path / 'artifact'))
+    loaded = PredictionModel()
+    loaded.load_artifact(str(tmp_path / 'artifact'))
+    assert loaded.evaluation_held_out is False
+
+    model.save_model(str(tmp_path / 'model.txt'))
+    from_file = PredictionModel()
+    from_file.load_model(str(tmp_path / 'model.txt'))
+    assert from_file.evaluation_held_out is False
+    assert model.evaluate_model()['held_out'] is False
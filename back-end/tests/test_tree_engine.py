@@ -0,0 +1,69 @@
+"""CompiledRanker must reproduce Booster.predict for the shipped ranker and for categorical splits."""
+import os
+
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+from app import config
+from app.models.features import FEATURES
+from app.models.prediction_model import PredictionModel
+from app.models.tree_engine import CompiledRanker
+
+ATOL = 1e-9
+
+
+def assert_parity(booster, X):
+    np.testing.assert_allclose(CompiledRanker(booster).predict(X), booster.predict(X), rtol=0, atol=ATOL)
+
+
+@pytest.fixture(scope='module')
+def shipped_model(tmp_path_factory):
+    model = PredictionModel()
+    model.load_data(config.DATASET_PATH)
+    if os.path.exists(config.MODEL_PATH):
+        model.load_model(config.MODEL_PATH)
+    else:
+        model.train_model(str(tmp_path_factory.mktemp('model') / 'trained_model.pkl'))
+        model.model = model.model.booster_
+    return model
+
+
+def test_shipped_model_parity(shipped_model):
+    X = shipped_model.df[FEATURES].to_numpy(dtype=np.float64)[::7]
+    assert_parity(shipped_model.model, X)
+
+
+def test_shipped_model_parity_with_missing_and_zero_values(shipped_model):
+    rng = np.random.default_rng(0)
+    X = shipped_model.df[FEATURES].to_numpy(dtype=np.float64)[::37].copy()
+    X[rng.random(X.shape) < 0.15] = np.nan
+    X[rng.random(X.shape) < 0.15] = 0.0
+    assert_parity(shipped_model.model, X)
+
+
+@pytest.fixture(scope='module')
+def categorical_booster():
+    rng = np.random.default_rng(1)
+    n = 4000
+    X = np.column_stack([rng.integers(0, 30, n), rng.integers(0, 8, n), rng.normal(size=n)]).astype(np.float64)
+    X[rng.random(n) < 0.1, 0] = np.nan
+    y = (np.isin(X[:, 0], [2, 5, 11, 17, 23]) + (X[:, 1] % 3 == 0) + (X[:, 2] > 0.5)).astype(int)
+    dataset = lgb.Dataset(X, label=y, group=[100] * (n // 100), categorical_feature=[0, 1])
+    params = {'objective': 'lambdarank', 'num_leaves': 15, 'min_data_in_leaf': 5, 'min_data_per_group': 5,
+              'cat_smooth': 1, 'max_cat_to_onehot': 4, 'verbose': -1, 'num_threads': 1, 'seed': 1}
+    return lgb.train(params, dataset, num_boost_round=30)
+
+
+def test_categorical_booster_is_compiled_with_categorical_splits(categorical_booster):
+    assert len(CompiledRanker(categorical_booster).categorical_nodes)
+
+
+@pytest.mark.parametrize('code', [np.nan, 0.0, -1.0, -0.5, 0.5, 29.0, 30.0, 1000.0])
+def test_categorical_booster_parity(categorical_booster, code):
+    rng = np.random.default_rng(2)
+    X = np.column_stack([rng.integers(0, 30, 500), rng.integers(0, 8, 500), rng.normal(size=500)]).astype(np.float64)
+    for column in (0, 1):
+        X_code = X.copy()
+        X_code[::2, column] = code
+        assert_parity(categorical_booster, X_code)
@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import time
+import pandas as pd
+from app import config
+from app.models.model_search import (
+    SEARCH_SPACE, build_fold_datasets, dataset_cache_dir, make_folds, search, train_final
+)
+from app.models.prediction_model import PredictionModel
+
+if __name__ == "__main__":
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Cross-validated hyperparameter search for the ranker")
+    parser.add_argument("--folds", choices=["group", "year"], default="group",
+                        help="GroupKFold over query groups, or leave one exam year out")
+    parser.add_argument("--n-splits", type=int, default=5, help="folds for --folds group")
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=cpus, help="trials run in parallel")
+    parser.add_argument("--threads-per-trial", type=int, default=1, help="LightGBM threads in each trial")
+    parser.add_argument("--rounds", type=int, default=1000, help="maximum boosting rounds per fold")
+    parser.add_argument("--early-stopping", type=int, default=50)
+    parser.add_argument("--no-prune", action="store_true", help="run every trial on every fold")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=os.path.join(config.DATA_DIR, "search"),
+                        help="leaderboard and Dataset cache directory")
+    parser.add_argument("--no-install", action="store_true",
+                        help="keep the serving model; write the best artifact under --output only")
+    args = parser.parse_args()
+
+    model = PredictionModel()
+    model.load_data(config.DATASET_PATH)
+    folds = make_folds(model.df, args.folds, args.n_splits)
+    cache_dir = dataset_cache_dir(os.path.join(args.output, "datasets"), config.DATASET_PATH,
+                                  args.folds, args.n_splits)
+    fold_paths = build_fold_datasets(model.df, folds, cache_dir)
+    print(f"{len(folds)} folds ({args.folds}), Dataset binaries in {cache_dir}")
+
+    results = search(
+        fold_paths, args.trials, workers=args.workers, threads_per_trial=args.threads_per_trial,
+        num_boost_round=args.rounds, early_stopping_rounds=args.early_stopping,
+        seed=args.seed, prune=not args.no_prune
+    )
+
+    run_dir = os.path.join(args.output, time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(run_dir, exist_ok=True)
+    leaderboard = pd.DataFrame([{
+        'trial': r['trial'],
+        'mean_ndcg@5': r['mean_ndcg@5'],
+        'folds': len(r['fold_scores']),
+        'pruned': r['pruned'],
+        'rounds': round(sum(r['best_iterations']) / len(r['best_iterations'])),
+        'seconds': round(r['seconds'], 1),
+        **{name: r['params'][name] for name in SEARCH_SPACE}
+    } for r in results])
+    leaderboard.to_csv(os.path.join(run_dir, "leaderboard.csv"), index=False)
+    with open(os.path.join(run_dir, "trials.json"), "w") as f:
+        json.dump(results, f, indent=2)
+    print(leaderboard.head(10).to_string(index=False))
+
+    best = results[0]
+    rounds = max(1, round(sum(best['best_iterations']) / len(best['best_iterations'])))
+    print(f"Best trial {best['trial']}: NDCG@5 {best['mean_ndcg@5']:.4f}; refitting on all rows for {rounds} rounds")
+    model.model = train_final(model.df, best['params'], rounds, num_threads=args.threads_per_trial * args.workers)
+    # /api/v1/evaluate's split is training data for this model; its cross-validated score is above
+    model.evaluation_held_out = False
+
+    if args.no_install:
+        model_path = os.path.join(run_dir, "model.txt")
+        artifact_path = os.path.join(run_dir, "artifact")
+    else:
+        model_path, artifact_path = config.MODEL_PATH, config.ARTIFACT_PATH
+    model.save_model(model_path)
+    model.save_artifact(artifact_path)
+    print(f"Leaderboard in {run_dir}; best model in {artifact_path}")
@@ -0,0 +1,24 @@
+import argparse
+import os
+import time
+import numpy as np
+from app import config
+from app.services.ml_service import MLService
+from app.services.whatif import build_whatif_table
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Precompute ranked recommendations over a z-score grid for /api/v1/whatif")
+    parser.add_argument("--min-zscore", type=float, default=-1.0)
+    parser.add_argument("--max-zscore", type=float, default=3.5)
+    parser.add_argument("--step", type=float, default=0.05)
+    parser.add_argument("--output", default=config.WHATIF_PATH)
+    args = parser.parse_args()
+
+    service = MLService(config.DATASET_PATH, config.MODEL_PATH, config.ARTIFACT_PATH)
+    grid = np.arange(args.min_zscore, args.max_zscore + args.step / 2, args.step)
+    start = time.perf_counter()
+    rows = build_whatif_table(service, args.output, grid)
+    print(f"{rows} lists ({len(grid)} z-scores) in {time.perf_counter() - start:.1f}s, "
+          f"{os.path.getsize(args.output) / 1e6:.1f} MB written to {args.output}")
+    print("Running services load it on startup or POST /api/v1/admin/reload")
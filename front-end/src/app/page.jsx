@@ -194,19 +194,34 @@ export default function Home() {
   const findUniversities = async (values) => {
     setIsProcessing(true);
     try {
-      // Fetch stream-specific recommendations
-      const streamResponse = await axios.post(
-        "http://localhost:8000/api/v1/recommend",
-        {
-          district: values.personalInfo.district,
-          stream: values.personalInfo.stream,
-          zscore: parseFloat(values.personalInfo.zScore),
-        }
-      );
-      setStreamResults(streamResponse.data.recommendations);
+      const student = {
+        district: values.personalInfo.district,
+        stream: values.personalInfo.stream,
+        zscore: parseFloat(values.personalInfo.zScore),
+      };
+
+      // One call scores stream-specific and Cross Stream courses together
+      let recommendations;
+      let crossStreamRecommendations = [];
+      if (showExtra) {
+        const response = await axios.post(
+          "http://localhost:8000/api/v1/recommend/all",
+          student
+        );
+        recommendations = response.data.recommendations;
+        crossStreamRecommendations = response.data.cross_stream_recommendations;
+      } else {
+        const response = await axios.post(
+          "http://localhost:8000/api/v1/recommend",
+          student
+        );
+        recommendations = response.data.recommendations;
+      }
+
+      setStreamResults(recommendations);
       setShowResults(true);
       toast.success(
-        `Found ${streamResponse.data.recommendations.length} stream-specific recommendations!`
+        `Found ${recommendations.length} stream-specific recommendations!`
       );
 
       // Scroll to stream results
@@ -216,27 +231,15 @@ export default function Home() {
           ?.scrollIntoView({ behavior: "smooth" });
       }, 100);
 
-      // Fetch Cross Stream recommendations if showExtra is checked
-      let crossStreamResponse = { data: { recommendations: [] } };
+      setCrossStreamResults(crossStreamRecommendations);
       if (showExtra) {
-        crossStreamResponse = await axios.post(
-          "http://localhost:8000/api/v1/recommend_cross_stream",
-          {
-            district: values.personalInfo.district,
-            stream: values.personalInfo.stream,
-            zscore: parseFloat(values.personalInfo.zScore),
-          }
-        );
-        setCrossStreamResults(crossStreamResponse.data.recommendations);
         toast.success(
-          `Found ${crossStreamResponse.data.recommendations.length} Cross Stream recommendations!`
+          `Found ${crossStreamRecommendations.length} Cross Stream recommendations!`
         );
-      } else {
-        setCrossStreamResults([]);
       }
 
       // Scroll to Cross Stream results if stream results are empty and showExtra is checked
-      if (streamResponse.data.recommendations.length === 0 && showExtra) {
+      if (recommendations.length === 0 && showExtra) {
         setTimeout(() => {
           document
             .getElementById("cross-stream-universities")